@@ -2,7 +2,7 @@
 # Copyright (C) 2024 Dez Moleski dez@moleski.com
 # MIT License: All uses allowed with attribution.
 #
-from wordgames import Word, WordList, AnagramsDict, LetterSetBitmask, ALPHABET_LIST
+from wordgames import Word, WordList, AnagramsDict, LetterSetBitmask, ALPHABET_LIST, cached_index
 import sys
 from copy import deepcopy
 from glob import glob
@@ -21,6 +21,20 @@ words_4l = WordList()
 # { ... "EB": [EBBS, EBON] ... }
 partials_5l = dict()
 partials_4l = dict()
+PARTIALS_VERSION = 4
+
+def build_partials(words: WordList, max_len: int) -> dict:
+   # Builds the partials dict for the given words, for starts of length 1 to max_len.
+   partials = dict()
+   for l in range(1,max_len+1):
+      for w in words.word_list:
+         s = w.word[0:l]
+         word_list = partials.get(s)
+         if word_list is None:
+            word_list = WordList()
+            partials[s] = word_list
+         word_list.add_word(w)
+   return partials
 
 # The two lists given are of the across & down Words & partials
 # found so far. For example, if current progress towards a complete
@@ -31,6 +45,9 @@ partials_4l = dict()
 #   I
 # Then across is [REMIT, ABODE]
 # and down is [RABI, EB, MO, ID, TE]
+# The down words and partials are kept as plain strings, so that extending
+# and checking them in the inner loop is just string concatenation and a
+# dict probe, with no Word built for each one.
 #
 # The lengths of the partial down words after the zero'th must all be the same,
 # and tell us the depth of the current recursion.
@@ -41,7 +58,7 @@ def find_squares(across: list, across_len: int, down: list, down_len: int):
 
    # The depth of the current recursion is the length of the second
    # partial down word. It's also the length of the across list.
-   depth1 = len(down[1].word)
+   depth1 = len(down[1])
    depth2 = len(across)
    if depth1 != depth2:
       exit("Depth check one is not equal to depth check two!")
@@ -54,7 +71,7 @@ def find_squares(across: list, across_len: int, down: list, down_len: int):
    
    # Let's try just one step, shall we?
    # Take the [depth] letter of the first down word...
-   across_start = down[0].word[depth]
+   across_start = down[0][depth]
    
    # For each potential across word starting with across_start,
    # if there's at least one down word corresponding to each
@@ -65,13 +82,13 @@ def find_squares(across: list, across_len: int, down: list, down_len: int):
       for possible_next_across in try_acrosses.word_list:
          try_downs = list()
          for i in range(1,5):
-            partial_next_down = down[i].word + possible_next_across.word[i]
+            partial_next_down = down[i] + possible_next_across.word[i]
             if last_word:
                if words_4l.contains(partial_next_down):
-                  try_downs.append(Word(partial_next_down))
+                  try_downs.append(partial_next_down)
             else:
                if partials_4l.get(partial_next_down) is not None:
-                  try_downs.append(Word(partial_next_down))
+                  try_downs.append(partial_next_down)
                   
          if len(try_downs) == 4:
             # Add this possible_next_across to the across list,
@@ -90,7 +107,7 @@ def find_squares(across: list, across_len: int, down: list, down_len: int):
                letterset = set(joined)
                letters_list = list(letterset)
                letters_list.sort()
-               print(len(letterset), ''.join(letters_list), next_acrosses, next_downs)
+               print(len(letterset), ''.join(letters_list), next_acrosses, '[' + ', '.join(next_downs) + ']')
             else:
                find_squares(next_acrosses, across_len, next_downs, down_len)
 
@@ -123,23 +140,9 @@ if __name__ == "__main__":
    print("N =", len(words_4l), file=sys.stderr, flush=True)
 
    # Build the partials dicts from 1 to the characteristic list item len-1.
-   for l in range(1,5):
-      for w in words_5l.word_list:
-         s = w.word[0:l]
-         word_list = partials_5l.get(s)
-         if word_list is None:
-            word_list = WordList()
-            partials_5l[s] = word_list
-         word_list.add_word(w)
-         
-   for l in range(1,4):
-      for w in words_4l.word_list:
-         s = w.word[0:l]
-         word_list = partials_4l.get(s)
-         if word_list is None:
-            word_list = WordList()
-            partials_4l[s] = word_list
-         word_list.add_word(w)
+   # They are cached on disk, keyed by the words they're built from.
+   partials_5l = cached_index('partials4', PARTIALS_VERSION, [words_5l], lambda: build_partials(words_5l, 4))
+   partials_4l = cached_index('partials3', PARTIALS_VERSION, [words_4l], lambda: build_partials(words_4l, 3))
          
    # For each 4-letter word that starts with the first letter of the given 5L word,
    # search for a 5x4 word square that can be completed. For example, given the
@@ -157,7 +160,6 @@ if __name__ == "__main__":
    # The initial incomplete portion of the down words is a list of the letters
    # of the first word minus its first letter.
    down_partial_strs = list(first_word.word)[1:]
-   down_partial_words = [Word(s) for s in down_partial_strs]
    for w in partials_4l[first_word.word[0]].word_list:
-      find_squares([first_word], 5, [w] + down_partial_words, 4)
+      find_squares([first_word], 5, [w.word] + down_partial_strs, 4)
    
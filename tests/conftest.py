@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wordgames
+
+
+@pytest.fixture(autouse=True)
+def index_cache_dir(tmp_path, monkeypatch):
+    # Keep every cached_index() call in a test inside that test's own directory.
+    monkeypatch.setattr(wordgames.INDEX_CACHE, 'directory', str(tmp_path / 'cache'))
+    return tmp_path / 'cache'
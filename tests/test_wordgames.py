@@ -0,0 +1,378 @@
+""" Each index and generator is checked against a brute-force scan of a small fixed word list. """
+import bz2
+import gzip
+import itertools
+import lzma
+import os
+import random
+import re
+import string
+
+import pytest
+
+from wordgames import (
+    BOGGLE_MIN_WORD_LEN, QUERY_CONTAINS, QUERY_EXCLUDES, QUERY_LENGTH, QUERY_LETTERSET, QUERY_PATTERN, QUERY_SUBSET,
+    QUERY_SUBSTRING, SCRABBLE_SIZE, BoggleSolver, DisjointLetterSetSearch, HangmanSolver, IndexCache, IsomorphIndex,
+    LetterOverlapIndex, NeighborhoodIndex, NgramIndex, PatternIndex, QueryPlanner, RoaringBitmap, ScrabbleBoard,
+    ScrabbleMoveGenerator, SuffixIndex, Word, WordLadderGraph, WordList, WordQuery, cached_index, count_word_frequencies,
+    distinct_sample, file_words, letter_pattern, load_frequencies, parse_grid, read_text_chunks, reservoir_sample,
+    sample_indices, save_frequencies, weighted_sample,
+)
+
+
+def make_words(n: int, letters: str, seed: int, min_len: int = 2, max_len: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < n:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(min_len, max_len))))
+    return sorted(words)
+
+WORDS = make_words(600, 'AEIRSTNLOCDP', 2024) + ['LEVEL', 'RADAR', 'REFER', 'CAT', 'COT', 'COG', 'DOG', 'DOT']
+WORDS = sorted(set(WORDS))
+
+
+@pytest.fixture
+def wl() -> WordList:
+    return WordList.from_strings(*WORDS)
+
+
+def pattern_regex(pattern: str) -> str:
+    regex = ''
+    for token in re.findall(r'\[\^?[A-Z]+\]|.', pattern.upper()):
+        if token == '*':
+            regex += '.*'
+        elif token == '?':
+            regex += '.'
+        else:
+            regex += token
+    return regex
+
+def one_edit(a: str, b: str) -> bool:
+    if a == b or abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        return sum(x != y for x, y in zip(a, b)) == 1
+    if len(a) > len(b):
+        a, b = b, a
+    return any(b[:i] + b[i+1:] == a for i in range(len(b)))
+
+def isomorphic(a: str, b: str) -> bool:
+    return len(a) == len(b) and len(set(zip(a, b))) == len(set(a)) == len(set(b))
+
+
+# WordList
+
+def test_wordlist_baseline_constructor():
+    words = [Word('B'), Word('A')]
+    wl = WordList(set(words), words)
+    assert [w.word for w in wl.word_list] == ['B', 'A']
+    assert not wl.list_is_sorted
+    assert wl.contains('a') and len(wl) == 2
+
+def test_wordlist_remove_and_merge(wl):
+    for s in WORDS[::3]:
+        wl.remove_str(s)
+    assert [w.word for w in wl.word_list] == [s for i, s in enumerate(WORDS) if i % 3]
+    other = WordList.from_strings(*WORDS[::3])
+    wl.add_wordlist(other)
+    assert wl.list_is_sorted
+    assert [w.word for w in wl.word_list] == WORDS
+
+def test_sorted_view_is_independent():
+    wl = WordList.from_strings('DOG', 'CAT', 'BEE')
+    view = WordList.sorted_view(wl)
+    view.remove_str('CAT')
+    wl.add_str('ANT')
+    assert [w.word for w in wl.word_list] == ['DOG', 'CAT', 'BEE', 'ANT']
+    assert [w.word for w in view.word_list] == ['BEE', 'DOG']
+    assert not view.contains('ANT')
+
+
+# Indexes
+
+@pytest.mark.parametrize('pattern', ['C?T', 'A*', '*ER', 'L*L', '[AEIOU]??', '[^AEIOU]*S', '*RA*', '??*T?', '*'])
+def test_pattern_index(wl, pattern):
+    index = PatternIndex.from_wordlist(wl)
+    expected = [s for s in WORDS if re.fullmatch(pattern_regex(pattern), s)]
+    assert sorted(w.word for w in index.match(pattern)) == expected
+
+@pytest.mark.parametrize('pattern', ['A[]*', '[^' + string.ascii_uppercase + ']', 'A[BC'])
+def test_pattern_index_rejects_bad_classes(wl, pattern):
+    with pytest.raises(ValueError):
+        PatternIndex.from_wordlist(wl).match(pattern)
+
+@pytest.mark.parametrize('sub', ['RA', 'TI', 'EEN', 'LEVE', 'Q'])
+def test_ngram_index(wl, sub):
+    index = NgramIndex.from_wordlist(wl)
+    assert sorted(index.words_containing(sub)) == [s for s in WORDS if sub in s]
+
+def test_neighborhood_index(wl):
+    index = NeighborhoodIndex.from_wordlist(wl)
+    for s in WORDS[::7] + ['CAT', 'COAT', 'XYZ']:
+        assert index.neighbors(s) == sorted(w for w in WORDS if one_edit(s, w))
+
+def test_word_ladder_graph(wl):
+    graph = WordLadderGraph.from_wordlist(wl, 3)
+    three = [s for s in WORDS if len(s) == 3]
+    assert graph.words == three
+    for i, s in enumerate(three):
+        assert [three[j] for j in graph.neighbors_of(i)] == [t for t in three if one_edit(s, t)]
+    ladder = graph.shortest_ladder('CAT', 'DOG')
+    assert ladder[0] == 'CAT' and ladder[-1] == 'DOG' and len(ladder) == 4
+    assert all(one_edit(a, b) for a, b in zip(ladder, ladder[1:]))
+
+@pytest.mark.parametrize('suffix', ['T', 'ER', 'AR', 'OOO'])
+def test_suffix_index(wl, suffix):
+    index = SuffixIndex.from_wordlist(wl)
+    assert index.ending_with(suffix) == [s for s in WORDS if s.endswith(suffix)]
+
+def test_suffix_index_non_ascii():
+    index = SuffixIndex.from_wordlist(WordList.from_strings('ABC', 'XBC', 'ÉBC'))
+    assert index.ending_with('BC') == ['ABC', 'XBC', 'ÉBC']
+
+def test_isomorph_index(wl):
+    index = IsomorphIndex.from_wordlist(wl)
+    for s in ['LEVEL', 'CAT', 'ANNA', 'ROTOR']:
+        assert sorted(index.isomorphs(s)) == [w for w in WORDS if isomorphic(s, w)]
+
+def test_letter_pattern_past_26_letters():
+    a = string.ascii_uppercase + 'ÉÈ'
+    b = string.ascii_uppercase + 'ÉÉ'
+    assert letter_pattern(a) != letter_pattern(b)
+    assert letter_pattern('LEVEL') == 'ABCBA'
+
+def test_disjoint_letter_set_search(wl):
+    search = DisjointLetterSetSearch.from_wordlist(wl, 3)
+    target = 'ACDEIOST'
+    solutions = search.mask_solutions(2, target, 6)
+    target_mask = Word(target).letter_set_mask
+    masks = sorted(set(w.letter_set_mask for w in wl.word_list if len(w.word) == 3 and w.is_heterogram()))
+    expected = sorted((a, b) for a, b in itertools.combinations(masks, 2)
+                      if not a & b and not (a | b) & ~target_mask and ((a | b) & target_mask).bit_count() >= 6)
+    assert solutions == expected
+
+def test_letter_overlap_index(wl):
+    index = LetterOverlapIndex.from_wordlist(wl)
+    for query in ['STONE', 'CAT', 'PRIDE']:
+        q = set(query)
+        expected = sorted(((w, len(q & set(w))) for w in WORDS if w != query), key=lambda p: (-p[1], p[0]))[:15]
+        assert [(w.word, score) for w, score in index.top_k(query, 15)] == expected
+
+def test_roaring_bitmap_set_algebra():
+    rng = random.Random(7)
+    for _ in range(20):
+        sets = list()
+        for _ in range(2):
+            ids = set(rng.sample(range(200000), rng.randint(0, 3000)))
+            start = rng.randrange(150000)
+            ids |= set(range(start, start + rng.randint(0, 10000))) # dense runs make bitmap and run containers
+            sets.append(ids)
+        a, b = [RoaringBitmap.from_ids(s) for s in sets]
+        assert a.to_ids() == sorted(sets[0]) and len(a) == len(sets[0])
+        assert (a & b).to_ids() == sorted(sets[0] & sets[1])
+        assert (a | b).to_ids() == sorted(sets[0] | sets[1])
+        assert (a - b).to_ids() == sorted(sets[0] - sets[1])
+        for x in rng.sample(range(200000), 50):
+            assert (x in a) == (x in sets[0])
+
+
+# Solvers
+
+def test_boggle_solver(wl):
+    grid = parse_grid('STAR ELIN OCDP AERT')
+    solver = BoggleSolver.from_wordlist(wl)
+    nbrs = solver.neighbors(4)
+
+    def traceable(s, i, used):
+        if not s.startswith(grid[i]):
+            return False
+        rest = s[len(grid[i]):]
+        return rest == '' or any(traceable(rest, j, used | 1 << j) for j in nbrs[i] if not used >> j & 1)
+
+    expected = [s for s in WORDS if len(s) >= BOGGLE_MIN_WORD_LEN and any(traceable(s, i, 1 << i) for i in range(16))]
+    assert solver.solve(grid) == expected
+
+def test_boggle_generate_grids_gives_up():
+    solver = BoggleSolver.from_wordlist(WordList.from_strings('CAT', 'DOG'))
+    assert solver.generate_grids(50, 100, 2, seed=1, processes=1, batch_size=100, max_attempts=300) == []
+
+def scrabble_brute_force(words: set, board: ScrabbleBoard, rack: str) -> set:
+    """ Every legal move, without blanks, as the sorted tuple of its placed tiles. """
+    S = SCRABBLE_SIZE
+    cells = board.cells
+    moves = set()
+    for across, r, c, w in itertools.product((True, False), range(S), range(S), words):
+        squares = [(r, c + i) if across else (r + i, c) for i in range(len(w))]
+        if max(squares[-1]) >= S:
+            continue
+        before = (r, c - 1) if across else (r - 1, c)
+        after = (r, c + len(w)) if across else (r + len(w), c)
+        if min(before) >= 0 and cells[before[0]][before[1]] or max(after) < S and cells[after[0]][after[1]]:
+            continue
+        if any(cells[a][b] and cells[a][b] != ch for (a, b), ch in zip(squares, w)):
+            continue
+        tiles = [(a, b, ch) for (a, b), ch in zip(squares, w) if not cells[a][b]]
+        if not tiles or any(rack.count(ch) < [t[2] for t in tiles].count(ch) for ch in set(w)):
+            continue
+        if board.is_empty():
+            if not (7, 7) in [(a, b) for a, b, _ in tiles]:
+                continue
+        elif not any(0 <= a + da < S and 0 <= b + db < S and cells[a + da][b + db]
+                     for a, b, _ in tiles for da, db in ((0, 1), (1, 0), (0, -1), (-1, 0))):
+            continue
+        # Every word formed across the main one must be in the word list too.
+        ok = True
+        da, db = (1, 0) if across else (0, 1)
+        for a, b, ch in tiles:
+            x, y = a, b
+            while x - da >= 0 and y - db >= 0 and cells[x - da][y - db]:
+                x, y = x - da, y - db
+            run = ''
+            while x < S and y < S and (cells[x][y] or (x, y) == (a, b)):
+                run += ch if (x, y) == (a, b) else cells[x][y]
+                x, y = x + da, y + db
+            if len(run) > 1 and not run in words:
+                ok = False
+        if ok:
+            moves.add(tuple(sorted(tiles)))
+    return moves
+
+def test_scrabble_moves_match_brute_force():
+    words = set(make_words(150, 'AEIRSTNLOD', 5, 2, 5))
+    generator = ScrabbleMoveGenerator.from_wordlist(WordList.from_strings(*words))
+    board = ScrabbleBoard()
+    rng = random.Random(3)
+    for turn in range(3):
+        rack = ''.join(rng.choice('AEIRSTNLOD') for _ in range(7))
+        moves = generator.moves(board, rack)
+        assert set(tuple(sorted(m.tiles)) for m in moves) == scrabble_brute_force(words, board, rack)
+        if moves:
+            board.play(moves[0])
+
+def test_scrabble_ignores_non_ascii_words():
+    generator = ScrabbleMoveGenerator.from_wordlist(WordList.from_strings('CAT', 'CAFÉ', 'CAR'))
+    assert set(m.word for m in generator.moves(ScrabbleBoard(), 'CAFERT')) == {'CAT', 'CAR'}
+    with pytest.raises(ValueError):
+        generator.moves(ScrabbleBoard(), 'CAÉ')
+
+def test_hangman_simulate_all_matches_simulate(wl):
+    solver = HangmanSolver.from_wordlist(wl)
+    results = solver.simulate_all([3, 4, 5])
+    assert len(results) == len([s for s in WORDS if len(s) in (3, 4, 5)])
+    for s, (n_guesses, wrong) in results.items():
+        guesses, simulated_wrong = solver.simulate(s)
+        assert (len(guesses), simulated_wrong) == (n_guesses, wrong)
+
+@pytest.mark.parametrize('text', ['length 4, contains AE', 'length 3-5, excludes ST, pattern *R?',
+                                  'subset of CATNOSE, distinct letters 4', 'contains "RA", length 5-7'])
+def test_query_planner(wl, text):
+    query = WordQuery.parse(text)
+
+    def holds(s, clause):
+        kind, arg = clause.kind, clause.arg
+        if kind == QUERY_LENGTH:
+            return arg[0] <= len(s) <= arg[1]
+        if kind == QUERY_CONTAINS:
+            return set(arg) <= set(s)
+        if kind == QUERY_EXCLUDES:
+            return not set(arg) & set(s)
+        if kind == QUERY_SUBSET:
+            return set(s) <= set(arg)
+        if kind == QUERY_LETTERSET:
+            return len(set(s)) == arg
+        if kind == QUERY_SUBSTRING:
+            return arg in s
+        if kind == QUERY_PATTERN:
+            return re.fullmatch(pattern_regex(arg), s) is not None
+
+    planner = QueryPlanner(wl)
+    expected = [s for s in WORDS if all(holds(s, c) for c in query.clauses)]
+    assert sorted(w.word for w in planner.run(text)) == expected
+    assert planner.count(query) == len(expected)
+    assert len(planner.plan(text)) == len(query.clauses)
+
+
+# Sampling
+
+def test_samplers_are_seeded_and_without_replacement():
+    assert reservoir_sample(range(1000), 10, 7) == reservoir_sample(range(1000), 10, 7)
+    assert reservoir_sample(range(3), 10, 7) == [0, 1, 2]
+    indices = sample_indices(50, 50, 1)
+    assert sorted(indices) == list(range(50))
+    assert weighted_sample('abc', [0, 1, 0], 3, 1) == ['b']
+    sample = distinct_sample(['cat', 'CAT', 'dog', 'Cat', 'emu'], 3, 1)
+    assert sorted(sample) == ['CAT', 'DOG', 'EMU']
+
+def test_random_from_file_is_distinct(tmp_path):
+    path = tmp_path / 'words'
+    path.write_text('cat\nCAT\ndog\ncat\nemu\nCat\nfox\n')
+    for seed in range(20):
+        sample = WordList.random_from_file(str(path), 3, seed)
+        assert len(sample) == 3
+        assert sample.word_list == WordList.random_from_file(str(path), 3, seed).word_list
+
+
+# Persistence and file reading
+
+def test_index_cache_round_trip(wl, index_cache_dir):
+    built = list()
+
+    def build():
+        built.append(1)
+        return NgramIndex.from_wordlist(wl)
+
+    first = cached_index('test', 1, [wl], build)
+    second = cached_index('test', 1, [wl], build)
+    assert len(built) == 1 and second == first and second is not first
+    cached_index('test', 2, [wl], build)
+    assert len(built) == 2
+    # A truncated entry is a miss, and gets rebuilt.
+    (path,) = [p for p in index_cache_dir.iterdir() if p.name.startswith('test-v1-')]
+    path.write_bytes(path.read_bytes()[:10])
+    assert cached_index('test', 1, [wl], build) == first
+    assert len(built) == 3
+
+def test_index_cache_eviction(wl, index_cache_dir):
+    cache = IndexCache(str(index_cache_dir), max_bytes=1)
+    cache.get('big', 1, [wl], lambda: list(range(1000)))
+    cache.get('big', 2, [wl], lambda: list(range(1000)))
+    assert len(cache.entries()) == 0
+
+@pytest.mark.parametrize('opener, suffix', [(gzip.open, '.gz'), (bz2.open, '.bz2'), (lzma.open, '.xz')])
+def test_compressed_word_files(tmp_path, opener, suffix):
+    text = '\n'.join(WORDS[::-1] + WORDS[:20]) + '\n'
+    plain = tmp_path / 'words'
+    plain.write_text(text)
+    for name in ('words' + suffix, 'words-no-suffix'):
+        with opener(tmp_path / name, 'wt') as f:
+            f.write(text)
+        loaded = WordList.from_file(str(tmp_path / name))
+        assert [w.word for w in loaded.word_list] == WORDS[::-1]
+        assert loaded.word_list == WordList.from_file(str(plain)).word_list
+        assert list(file_words(str(tmp_path / name))) == text.split()
+
+def test_read_text_chunks_never_split_words(tmp_path):
+    path = tmp_path / 'text'
+    path.write_text(' '.join(WORDS * 3))
+    chunks = list(read_text_chunks(str(path), 100))
+    assert len(chunks) > 1
+    assert b''.join(chunks).split() == [s.encode() for s in WORDS * 3]
+    assert [word for chunk in chunks for word in chunk.split()] == [s.encode() for s in WORDS * 3]
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_count_word_frequencies(tmp_path, processes):
+    rng = random.Random(11)
+    tokens = [rng.choice(WORDS + ['ZEBRA', 'QUIZ']) for _ in range(5000)]
+    text = ' '.join(t.lower() if i % 3 else t + ',' for i, t in enumerate(tokens))
+    with gzip.open(tmp_path / 'dump.gz', 'wt') as f:
+        f.write(text)
+    (tmp_path / 'dump.txt').write_text(text)
+    targets = WordList.from_strings(*WORDS[::2])
+    counts = count_word_frequencies([str(tmp_path / 'dump.txt'), str(tmp_path / 'dump.gz')], targets, processes, 512)
+    expected = {s: 2 * tokens.count(s) for s in WORDS[::2] if s in tokens}
+    assert dict(counts) == expected
+
+def test_frequencies_round_trip(tmp_path):
+    path = str(tmp_path / 'freq')
+    save_frequencies({'CAT': 3, 'DOG': 10}, path)
+    assert load_frequencies(path) == {'CAT': 3, 'DOG': 10}
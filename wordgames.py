@@ -4,8 +4,27 @@
 
 """Elements for making word game generators and solvers.
 """
+import bisect
+import bz2
+import gc
+import collections
+import gzip
+import io
+import hashlib
+import heapq
+import itertools
+import lzma
+import math
+import multiprocessing
+import operator
+import os
+import pickle
 import random
+import re
 import sys
+import tempfile
+import weakref
+from array import array
 from dataclasses import dataclass
 from dataclasses import field
 
@@ -119,8 +138,8 @@ class Word:
         object.__setattr__(self, 'letter_set_mask', self.letter_set_bits.bitmask)
         
     def init_bitmask(self):
-        for c in self.letter_set:
-            self.letter_set_bits.add(c)
+        # The letters are distinct and already uppercase, so adding their bits ORs them.
+        self.letter_set_bits.bitmask |= sum(map(CHAR_BITMASK.get, self.letter_set, itertools.repeat(0)))
         
     def count_vowels(self) -> float:
         '''Returns the count of unique vowels (not counting repeats) used in the word.
@@ -148,17 +167,15 @@ class Word:
         return self.letter_set == word.letter_set and self.word != word.word
 
     def is_anagram_of_str(self, s: str) -> bool:
-        return self.is_anagram_of_word(Word(s))
+        s = s.upper()
+        return self.letter_set == set(s) and self.word != s
 
     def is_heterogram(self) -> bool:
         '''Heterograms by definition contain no repeated letters.'''
         return len(self.word) == len(self.letter_set)
 
     def is_palindrome(self) -> bool:
-        halflen: int = len(self.word) // 2 # use floor division operator //
-        front_half = self.word[0:halflen]
-        rev_back_half = self.word[:-(halflen+1):-1]
-        return front_half == rev_back_half
+        return self.word == self.word[::-1]
 
     def reversed(self) -> object:
         return Word(self.word[::-1])
@@ -169,47 +186,376 @@ class Word:
         letters.sort()
         return ''.join(letters)
 
-@dataclass
+    def letter_pattern(self) -> str:
+        '''Returns the repeat "shape" of the word, e.g. ABCBA for LEVEL, ABCDE for a 5-letter heterogram.'''
+        return letter_pattern(self.word)
+
+def letter_pattern(s: str) -> str:
+    '''Renames the letters of s to A, B, C... in order of first appearance, e.g. LEVEL -> ABCBA.
+       Past the 26th distinct character the names carry on through the code points after Z,
+       so two different characters never share a name.
+    '''
+    names = dict()
+    for c in s:
+        if not c in names:
+            names[c] = chr(ord(A) + len(names))
+    return ''.join([names[c] for c in s])
+
+# Identical words share one Word object for as long as any list holds it.
+WORD_POOL = weakref.WeakValueDictionary()
+
+def intern_word(s: str) -> Word:
+    """ Returns the pooled Word for s, creating it only if no live Word has the same letters. """
+    s = s.upper()
+    word = WORD_POOL.get(s)
+    if word is None:
+        word = Word(s)
+        WORD_POOL[s] = word
+    return word
+
+def sample_rng(seed=None) -> random.Random:
+    """ Returns seed itself if it is already a random.Random, otherwise a new one seeded with it.
+        A seed of None draws from the OS, so only an explicit seed makes a sample reproducible.
+    """
+    if isinstance(seed, random.Random):
+        return seed
+    return random.Random(seed)
+
+def reservoir_sample(items, k: int, seed=None) -> list:
+    """ Returns k items chosen uniformly without replacement from the iterable items, in one
+        pass and O(k) memory, so items can be a stream far too big to hold (Li's Algorithm L).
+        If items has k or fewer entries they are all returned, in their original order.
+    """
+    if k < 0:
+        raise ValueError(f"Sample size must not be negative: {k}")
+    rng = sample_rng(seed)
+    it = iter(items)
+    reservoir = list(itertools.islice(it, k))
+    if len(reservoir) < k or k == 0:
+        return reservoir # PUNCH-OUT
+    # Rather than drawing for every item (Algorithm R), jump straight to the next item
+    # that will enter the reservoir; the gaps are geometric with a shrinking rate w.
+    # 1 - random() is in (0, 1], which keeps every log() finite.
+    end = object()
+    w = math.exp(math.log(1.0 - rng.random()) / k)
+    while w < 1.0:
+        skip = int(math.log(1.0 - rng.random()) / math.log(1.0 - w))
+        item = next(itertools.islice(it, skip, None), end)
+        if item is end:
+            break
+        reservoir[rng.randrange(k)] = item
+        w *= math.exp(math.log(1.0 - rng.random()) / k)
+    return reservoir
+
+def distinct_sample(strs, k: int, seed=None) -> list[str]:
+    """ Returns k distinct strings chosen uniformly from the distinct values of the iterable strs,
+        compared case-insensitively and returned uppercase, in one pass and O(k) memory.
+        Each value gets a pseudo-random priority from a keyed hash of it, so repeats of a value
+        share one priority, and the k values with the lowest priorities are kept (bottom-k).
+        If strs has k or fewer distinct values they are all returned.
+    """
+    if k < 0:
+        raise ValueError(f"Sample size must not be negative: {k}")
+    hash_key = sample_rng(seed).getrandbits(64).to_bytes(8, 'little')
+    heap = list() # max-heap (by negated priority) of the k lowest priorities so far
+    members = set()
+    for s in strs:
+        s = s.upper()
+        if s in members:
+            continue
+        priority = int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8, key=hash_key).digest(), 'little')
+        if len(heap) < k:
+            heapq.heappush(heap, (-priority, s))
+            members.add(s)
+        elif k > 0 and priority < -heap[0][0]:
+            members.discard(heapq.heapreplace(heap, (-priority, s))[1])
+            members.add(s)
+    return [s for _, s in sorted(heap, reverse=True)]
+
+def sample_indices(n: int, k: int, seed=None) -> list[int]:
+    """ Returns k distinct indices chosen uniformly from range(n), in random order.
+        Floyd's algorithm makes exactly k draws however close k is to n.
+    """
+    if not 0 <= k <= n:
+        raise ValueError(f"Cannot sample {k} distinct indices from {n}")
+    rng = sample_rng(seed)
+    chosen = dict() # insertion-ordered set
+    for j in range(n - k, n):
+        i = rng.randrange(j + 1)
+        chosen[j if i in chosen else i] = None
+    indices = list(chosen)
+    # Floyd's insertion order is biased towards low indices first, so shuffle it.
+    rng.shuffle(indices)
+    return indices
+
+def weighted_sample(items, weights, k: int, seed=None) -> list:
+    """ Returns k items chosen without replacement from the iterable items, each with probability
+        proportional to its weight in the parallel iterable weights, in one pass and O(k) memory
+        (Efraimidis and Spirakis' A-Res). Items with a weight of zero are never chosen.
+        The sample comes back heaviest key first; fewer than k items come back if fewer are eligible.
+    """
+    if k < 0:
+        raise ValueError(f"Sample size must not be negative: {k}")
+    rng = sample_rng(seed)
+    heap = list() # min-heap of (key, tiebreak, item) holding the k largest keys so far
+    for n, (item, weight) in enumerate(zip(items, weights)):
+        if weight < 0:
+            raise ValueError(f"Sample weights must not be negative: {weight}")
+        if weight == 0 or k == 0:
+            continue
+        # Comparing log(u) / weight orders the same as u ** (1 / weight) without underflowing.
+        key = math.log(1.0 - rng.random()) / weight
+        if len(heap) < k:
+            heapq.heappush(heap, (key, n, item))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, n, item))
+    return [item for key, n, item in sorted(heap, reverse=True)]
+
+# Compressed files are recognised by their suffix or, failing that, by their first bytes.
+COMPRESSED_SUFFIXES = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+COMPRESSED_MAGIC = {b'\x1f\x8b': gzip.open, b'BZh': bz2.open, b'\xfd7zXZ\x00': lzma.open}
+READ_BLOCK_BYTES = 1 << 22 # word files are read and decoded this many bytes at a time
+
+def open_binary(path: str):
+    """ Opens path for reading bytes, decompressing it if it is gzip, bzip2 or xz. """
+    opener = COMPRESSED_SUFFIXES.get(os.path.splitext(path)[1].lower())
+    if opener is None:
+        with open(path, 'rb') as f:
+            head = f.read(max(map(len, COMPRESSED_MAGIC)))
+        opener = next((o for magic, o in COMPRESSED_MAGIC.items() if head.startswith(magic)), open)
+    return opener(path, 'rb')
+
+def open_text(path: str):
+    """ Opens path for reading text, like open(path, 'r'), decompressing it as open_binary does. """
+    return io.TextIOWrapper(open_binary(path))
+
+def read_text_chunks(path: str, chunk_bytes: int = READ_BLOCK_BYTES):
+    """ Yields the (decompressed) bytes of the file at path in chunks of about chunk_bytes,
+        each cut after whitespace so that no word is split between two chunks.
+    """
+    carry = b''
+    with open_binary(path) as f:
+        while True:
+            block = f.read(chunk_bytes)
+            if not block:
+                break
+            block = carry + block
+            cut = max(block.rfind(b'\n'), block.rfind(b' '), block.rfind(b'\t')) + 1
+            if cut == 0:
+                cut = len(block) # no whitespace at all, so there's no better place to cut
+            carry = block[cut:]
+            yield block[:cut]
+    if carry:
+        yield carry
+
+def file_words(path: str):
+    """ Yields the whitespace-separated words of the file at path, reading one line at a time. """
+    with open_text(path) as f:
+        for line in f:
+            yield from line.split()
+
+def intern_words(strs: list[str]) -> list[Word]:
+    """ Returns the pooled Words for a list of uppercase strings, as intern_word does one at a time.
+        The cyclic garbage collector is paused meanwhile: building a big batch of Words would
+        otherwise set it off over and over, rescanning everything built so far each time.
+    """
+    pool = WORD_POOL
+    words = list()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for s in strs:
+            word = pool.get(s)
+            if word is None:
+                word = Word(s)
+                pool[s] = word
+            words.append(word)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return words
+
+WORDLIST_COMPACT_MIN = 1024 # don't compact away fewer removed slots than this...
+WORDLIST_COMPACT_FRACTION = 0.25 # ...or less than this fraction of all the slots
+
+@dataclass(init=False)
 class WordList:
+    """ A set of Words that also keeps the order they were added in.
+        The order is kept in a list of slots; removing a word just clears its
+        slot (found through slot_of), and the cleared slots are squeezed out when
+        there are enough of them, or when word_list is next read.
+        Sortedness is tracked as words are added, so a list read from a sorted
+        file never needs sorting, and adding one sorted list to another is a
+        linear merge.
+        It's made as it always was, from an optional set of Words and an optional list
+        of them in order (see __init__); everything else is built from those.
+    """
     word_set: set = field(default_factory=set)
-    word_list: list = field(default_factory=list)
+    slots: list = field(default_factory=list, repr=False)        # Words in order, None where removed
     list_is_sorted: bool = False
-    
+    word_dict: dict = field(default_factory=dict, repr=False)    # word string -> Word, for lookups by string
+    slot_of: dict = field(default_factory=dict, repr=False)      # word string -> index in slots
+    n_removed: int = 0                                           # count of None slots
+    length_index: dict = field(default=None, repr=False, compare=False) # len -> list of Words, built on demand
+    freqs: dict = field(default_factory=dict, repr=False, compare=False) # word string -> corpus frequency, if known
+
+    def __init__(self, word_set: set = None, word_list: list = None, list_is_sorted: bool = False):
+        """ word_set and word_list are the Words and their order. Either may be left out: without
+            a list the set's Words are taken in its iteration order, and without a set it is made
+            from the list. list_is_sorted says the given list is known to be sorted; a list of
+            fewer than two words always is, and sortedness is tracked as words are added.
+        """
+        if word_list is None:
+            word_list = list() if word_set is None else list(word_set)
+        if word_set is None:
+            word_set = set(word_list)
+        self.word_set = word_set
+        self.slots = list(word_list)
+        self.list_is_sorted = list_is_sorted or len(self.slots) < 2
+        self.word_dict = {w.word: w for w in self.slots}
+        self.slot_of = {w.word: i for i, w in enumerate(self.slots)}
+        self.n_removed = 0
+        self.length_index = None
+        self.freqs = dict()
+
     def __repr__(self) -> str:
         return ' '.join(map(lambda w: str(w), self.word_list))
     
     def __len__(self) -> int:
         return len(self.word_set)
+
+    @property
+    def word_list(self) -> list:
+        """ The Words in order. This is the list itself, not a copy: don't modify it. """
+        if self.n_removed > 0:
+            self.compact()
+        return self.slots
+
+    def words_of_length(self, n: int) -> list[Word]:
+        """ Returns the Words of length n, in order, from a length index kept until the list changes. """
+        if self.length_index is None:
+            self.length_index = words_by_length(self)
+        return self.length_index.get(n, [])
+
+    def stream(self) -> object:
+        return WordStream(self)
+
+    def compact(self):
+        self.slots = [w for w in self.slots if w is not None]
+        self.slot_of = {w.word: i for i, w in enumerate(self.slots)}
+        self.n_removed = 0
     
     def add_word(self, word: Word):
-        if not word in self.word_set:
+        if not word.word in self.word_dict:
+            if self.list_is_sorted:
+                last = self.last_word()
+                if last is not None and word < last:
+                    self.list_is_sorted = False
+            self.word_dict[word.word] = word
             self.word_set.add(word)
-            self.word_list.append(word)
-            self.list_is_sorted = False
+            self.slot_of[word.word] = len(self.slots)
+            self.slots.append(word)
+            self.length_index = None
+
+    def last_word(self) -> Word:
+        for w in reversed(self.slots):
+            if w is not None:
+                return w
+        return None
     
     def add_str(self, s: str):
-        self.add_word(Word(s))
+        s = s.upper()
+        if not s in self.word_dict:
+            self.add_word(intern_word(s))
     
     def add_str_list(self, l: list[str]):
-        for s in l:
-            self.add_word(Word(s))
+        """ Adds the words of l in order. Repeats, and words already in the list, are
+            dropped before any Word is built, and the rest are appended in one go.
+        """
+        word_dict = self.word_dict
+        new = [s for s in dict.fromkeys(map(str.upper, l)) if not s in word_dict]
+        if len(new) == 0:
+            return # PUNCH-OUT
+        if self.list_is_sorted:
+            last = self.last_word()
+            prev = last.word if last is not None else ''
+            for s in new:
+                if s < prev:
+                    self.list_is_sorted = False
+                    break
+                prev = s
+        words = intern_words(new)
+        n = len(self.slots)
+        self.slots.extend(words)
+        self.word_set.update(words)
+        word_dict.update(zip(new, words))
+        self.slot_of.update(zip(new, range(n, n + len(new))))
+        self.length_index = None
     
     def add_wordlist(self, wl: object):
-        for word in wl.word_set:
-            self.add_word(word)
+        """ Adds the words of wl in wl's order. If both lists are sorted they are merged in linear time. """
+        if self.list_is_sorted and wl.list_is_sorted and len(self.word_set) > 0:
+            self.merge_sorted(wl.word_list)
+        else:
+            for word in wl.word_list:
+                self.add_word(word)
+
+    def merge_sorted(self, words: list[Word]):
+        mine = self.word_list
+        merged = list()
+        i = 0
+        n = len(mine)
+        for word in words:
+            while i < n and mine[i] < word:
+                merged.append(mine[i])
+                i += 1
+            if word.word in self.word_dict:
+                continue
+            self.word_dict[word.word] = word
+            self.word_set.add(word)
+            merged.append(word)
+        merged.extend(mine[i:])
+        self.slots = merged
+        self.length_index = None
+        self.slot_of = {w.word: i for i, w in enumerate(merged)}
     
     def contains(self, s: str) -> bool:
-        return (Word(s) in self.word_set)
+        # Words are uppercase, so an uppercase s needs just the one dict probe.
+        return s in self.word_dict or s.upper() in self.word_dict
     
     def contains_word(self, word: Word) -> bool:
-        return (word in self.word_set)
+        return (word.word in self.word_dict)
+
+    def get(self, s: str) -> Word:
+        """ Returns the list's Word for s, or None if it's not in the list. """
+        word = self.word_dict.get(s)
+        return word if word is not None else self.word_dict.get(s.upper())
     
     def remove_word(self, word: Word):
+        del self.word_dict[word.word]
         self.word_set.remove(word)
-        self.word_list.remove(word)
+        self.slots[self.slot_of.pop(word.word)] = None
+        self.freqs.pop(word.word, None)
+        self.n_removed += 1
+        self.length_index = None
+        if self.n_removed >= WORDLIST_COMPACT_MIN and self.n_removed >= len(self.slots) * WORDLIST_COMPACT_FRACTION:
+            self.compact()
         
     def remove_str(self, s: str):
-        self.remove_word(Word(s))
+        self.remove_word(self.word_dict[s.upper()])
+
+    def frequency(self, w) -> int:
+        """ Returns the corpus frequency of w (a Word or a string), 0 if it's unknown. """
+        return self.freqs.get(w.word if isinstance(w, Word) else w.upper(), 0)
+
+    def set_frequencies(self, counts: dict):
+        """ Replaces the frequency column with counts (word string -> count), keeping only this list's words. """
+        self.freqs.clear()
+        self.freqs.update((s, n) for s, n in counts.items() if s in self.word_dict)
+
+    def by_frequency(self) -> list[Word]:
+        """ Returns the Words most frequent first, ties in list order. """
+        return sorted(self.word_list, key=self.frequency, reverse=True)
 
     def digraphs_by_occurrence(self) -> dict:
         """ Returns a dictionary with the digraph as key and 
@@ -277,139 +623,3238 @@ class WordList:
     def sort(self) -> None:
         if not self.list_is_sorted:
             self.word_list.sort()
+            self.slot_of = {w.word: i for i, w in enumerate(self.slots)}
+            self.length_index = None
             self.list_is_sorted = True
 
     @classmethod
-    def from_strings(cls, *strs: str) -> object:
-        wl = cls()
-        for s in strs:
-            wl.add_str(s)
-        return wl
+    def sorted_view(cls, wl: object) -> object:
+        """ Returns a sorted WordList of wl's Words. It reuses the Words themselves, but has its
+            own set and dicts, so changing either list leaves the other alone.
+        """
+        view = cls(set(wl.word_set), sorted(wl.word_list), True)
+        view.freqs.update(wl.freqs)
+        return view
+
+    @classmethod
+    def from_strings(cls, *strs: str) -> object:
+        wl = cls()
+        for s in strs:
+            wl.add_str(s)
+        return wl
+
+    @classmethod
+    def from_word_set(cls, w_set: set) -> object:
+        wl = cls()
+        for w in w_set:
+            wl.add_word(w)
+        return wl
+    
+    @classmethod
+    def from_file(cls, path: str) -> object:
+        """ Reads the whitespace-separated words of the file at path, which may be compressed
+            (see open_binary). The file is decoded and split a large block at a time.
+        """
+        wl = cls()
+        for chunk in read_text_chunks(path):
+            wl.add_str_list(chunk.decode().upper().split())
+        return wl
+
+    @classmethod
+    def random_from_wordlist(cls, wl: object, N: int, seed=None) -> object:
+        """ N is the desired number of words to retain out of
+            the given WordList wl.
+            If N > len(words) then the given WordList is returned,
+            otherwise a new WordList is returned of size N.
+            Pass a seed to get the same N words back every time.
+        """
+        if N > len(wl):
+            return wl # PUNCH-OUT
+        words = wl.word_list
+        rl = cls()
+        for i in sample_indices(len(words), N, seed):
+            rl.add_word(words[i])
+        return rl
+
+    @classmethod
+    def random_from_file(cls, path: str, N: int, seed=None) -> object:
+        """ N is the desired number of words to retain out of
+            whatever is loaded from the given path.
+            If N > len(words) then all the words are kept.
+            The file is streamed through distinct_sample, so only the N chosen
+            words are ever built, however big the file is, and a word repeated
+            in the file is no more likely to be chosen than any other.
+        """
+        rl = cls()
+        rl.add_str_list(distinct_sample(file_words(path), N, seed))
+        return rl
+
+    @classmethod
+    def weighted_random_from_wordlist(cls, wl: object, N: int, weight, seed=None) -> object:
+        """ Returns a new WordList of up to N words from wl, chosen without replacement
+            with probability proportional to weight(word). Words weighing 0 are never chosen.
+        """
+        words = wl.word_list
+        rl = cls()
+        for w in weighted_sample(words, map(weight, words), N, seed):
+            rl.add_word(w)
+        return rl
+
+    @classmethod
+    def from_sub_alphabet_hgrams(cls, words: list, alphabet: set) -> object:
+        sub_wl = cls()
+        for w in words:
+            if w.is_heterogram() and w.letter_set.issubset(alphabet):
+                sub_wl.add_word(w)
+        return sub_wl
+    
+STREAM_WHERE = 'where'
+STREAM_MAP = 'map'
+
+@dataclass
+class WordStream:
+    """ A lazy query over the Words of a WordList (or any iterable of Words), e.g.
+            wl.stream().where_len(5).where_letterset_size(4).map(lambda w: w.word).to_list()
+        Each step returns a new stream; nothing is read until the stream is
+        iterated or materialized (to_list, to_wordlist, count, take...), and then
+        the words flow through the steps one at a time, so no intermediate lists
+        are built. A where_len straight off a WordList reads just the words of
+        that length from the list's length index.
+        The where_ steps expect Words, so they go before any map.
+    """
+    source: object
+    steps: tuple = ()
+    length: int = None # where_len served from the source's length index
+
+    def __iter__(self):
+        if self.length is not None:
+            it = iter(self.source.words_of_length(self.length))
+        elif isinstance(self.source, WordList):
+            it = iter(self.source.word_list)
+        else:
+            it = iter(self.source)
+        for kind, fn in self.steps:
+            it = filter(fn, it) if kind == STREAM_WHERE else map(fn, it)
+        return it
+
+    def where(self, pred) -> object:
+        return WordStream(self.source, self.steps + ((STREAM_WHERE, pred),), self.length)
+
+    def map(self, fn) -> object:
+        return WordStream(self.source, self.steps + ((STREAM_MAP, fn),), self.length)
+
+    def where_len(self, n: int) -> object:
+        if len(self.steps) == 0 and self.length is None and isinstance(self.source, WordList):
+            return WordStream(self.source, self.steps, n)
+        return self.where(lambda w: len(w.word) == n)
+
+    def where_letterset_size(self, n: int) -> object:
+        return self.where(lambda w: len(w.letter_set) == n)
+
+    def where_heterogram(self) -> object:
+        return self.where(lambda w: w.is_heterogram())
+
+    def where_in(self, wl: WordList) -> object:
+        return self.where(lambda w: w.word in wl.word_dict)
+
+    def take(self, n: int) -> list:
+        return list(itertools.islice(self, n))
+
+    def first(self):
+        return next(iter(self), None)
+
+    def count(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_list(self) -> list:
+        return list(self)
+
+    def to_wordlist(self) -> WordList:
+        wl = WordList()
+        for w in self:
+            wl.add_word(w)
+        return wl
+
+@dataclass
+class AnagramsDict:
+    """ A dictionary of lists of anagrams.
+        The key to each list is the sorted letter set for the anagrams.
+    """
+    anagrams: dict = field(default_factory=dict)
+    CACHE_VERSION = 1
+
+    def __len__(self) -> int:
+        return len(self.anagrams)
+
+    def word_key(self, w: Word) -> str:
+        return w.sorted_letters()
+    
+    def add_wordlist(self, wl: WordList):
+        self.add_words(wl.word_set)
+
+    def add_words(self, words):
+        """ Adds each Word from any iterable of Words, e.g. a WordStream. """
+        for word in words:
+            key = self.word_key(word)
+            if not key in self.anagrams:
+                self.anagrams[key] = list()
+            self.anagrams[key].append(word.word)
+
+    def anagrams_of_word(self, w: Word) -> list:
+        ''' Returns None if there are no anagrams of w in the dict.
+            Returns a list (not containing w) of anagram strings if w is found.
+        '''
+        key = self.word_key(w)
+        agram_list = self.anagrams.get(key)
+        agrams = None
+        if not agram_list is None:
+            agrams = agram_list.copy()
+            agrams.remove(w.word)
+        return agrams
+    
+    def anagrams_of_str(self, s: str) -> list:
+        return self.anagrams_of_word(Word(s))
+    
+    def prune_keys(self, delkeys: list[str]):
+        for k in delkeys:
+            del self.anagrams[k]
+
+    def prune(self):
+        '''Delete keys with fewer than two anagrams - these are often uninteresting.'''
+        self.prune_keys([k for k in self.anagrams if len(self.anagrams[k]) < 2])
+
+    def sort(self):
+        '''Sort each list of anagrams.'''
+        for v in self.anagrams.values():
+            v.sort()
+            
+    def total_words(self) -> int:
+        '''Returns sum of length of all anagrams lists in the dictionary.'''
+        total = 0
+        for k,v in self.anagrams.items():
+            total += len(v)
+        return total
+
+    @classmethod
+    def for_wordlist(cls, wl: WordList) -> object:
+        '''Returns a new dict of the anagrams in wl, cached on disk (see IndexCache).'''
+        def build():
+            ad = cls()
+            ad.add_wordlist(wl)
+            return ad
+        return cached_index(cls.__name__, cls.CACHE_VERSION, [wl], build)
+
+@dataclass
+class PerfectAnagramsDict(AnagramsDict):
+    """ A dictionary of lists of anagrams.
+        The key to each list is the sorted letter LIST, joined back into a string, for the anagrams.
+        This yields what are called "perfect" anagrams, ie formed from exactly the same letters
+        respecting repeats, vs regular anagrams, which are formed from the same SET of letters
+        without regard to repeated letters.
+    """
+    def word_key(self, w: Word) -> str:
+        letters = sorted(list(w.word))
+        return ''.join(letters)
+    
+def ids_to_bits(ids) -> int:
+    """ Returns a bitset (a plain int) with the bit set for each given word id.
+    """
+    ids = list(ids)
+    if len(ids) == 0:
+        return 0
+    buf = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+def bits_to_ids(bits: int) -> list[int]:
+    """ Returns the list of word ids (in ascending order) whose bits are set in the bitset.
+        Works a 64-bit word at a time so that the empty stretches are skipped cheaply.
+    """
+    ids = list()
+    if bits <= 0:
+        return ids
+    n_words = (bits.bit_length() + 63) // 64
+    for word_i, word in enumerate(memoryview(bits.to_bytes(n_words * 8, 'little')).cast('Q')):
+        base = word_i * 64
+        while word:
+            low = word & -word
+            ids.append(base + low.bit_length() - 1)
+            word ^= low
+    return ids
+
+PATTERN_STAR = '*'
+
+@dataclass
+class PatternIndex:
+    """ Crossword-style pattern matching over a word list, e.g. "A?P?E", "*GN*",
+        "[AEIOU]??[^S]", with optional length bounds.
+          ?        any single letter
+          *        any run of letters (including none)
+          [ABC]    any one of the given letters
+          [^ABC]   any letter except the given letters
+        Each word is given an id (its position in the word list), and the index
+        keeps a bitset of word ids for each length, for each (position, letter)
+        counting from the start of the word, and for each (position, letter)
+        counting back from the end of the word. A pattern is answered by ANDing
+        those bitsets together; only the part of a pattern between two stars
+        has to be verified word by word.
+    """
+    CACHE_VERSION = 1
+    words: list = field(default_factory=list)
+    by_length: dict = field(default_factory=dict)      # len -> bitset
+    by_position: dict = field(default_factory=dict)    # (pos, letter) -> bitset
+    by_rposition: dict = field(default_factory=dict)   # (pos from end, letter) -> bitset
+    by_letter: dict = field(default_factory=dict)      # letter -> bitset of words containing it
+    class_cache: dict = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add_wordlist(self, wl: WordList):
+        len_ids = dict()
+        pos_ids = dict()
+        rpos_ids = dict()
+        letter_ids = dict()
+        for word_id, w in enumerate(wl.word_list, len(self.words)):
+            self.words.append(w)
+            s = w.word
+            n = len(s)
+            len_ids.setdefault(n, []).append(word_id)
+            for i, c in enumerate(s):
+                pos_ids.setdefault((i, c), []).append(word_id)
+                rpos_ids.setdefault((n - 1 - i, c), []).append(word_id)
+            for c in w.letter_set:
+                letter_ids.setdefault(c, []).append(word_id)
+        for table, ids_table in ((self.by_length, len_ids), (self.by_position, pos_ids),
+                                 (self.by_rposition, rpos_ids), (self.by_letter, letter_ids)):
+            for k, ids in ids_table.items():
+                table[k] = table.get(k, 0) | ids_to_bits(ids)
+        self.class_cache.clear()
+
+    @staticmethod
+    def parse(pattern: str) -> list:
+        """ Returns the pattern as a list of tokens: PATTERN_STAR, None for '?',
+            or a string of the allowed letters for a fixed letter or letter class.
+        """
+        tokens = list()
+        p = pattern.upper()
+        i = 0
+        while i < len(p):
+            c = p[i]
+            if c == '[':
+                end = p.find(']', i)
+                if end < 0:
+                    raise ValueError(f'Unterminated letter class in pattern: {pattern}')
+                letters = p[i+1:end]
+                if letters.startswith('^'):
+                    letters = ''.join([l for l in ALPHABET_LIST if not l in letters[1:]])
+                if len(letters) == 0:
+                    raise ValueError(f'Empty letter class in pattern: {pattern}')
+                tokens.append(''.join(sorted(set(letters))))
+                i = end + 1
+                continue
+            if c == PATTERN_STAR:
+                if len(tokens) == 0 or tokens[-1] != PATTERN_STAR:
+                    tokens.append(PATTERN_STAR)
+            elif c in '?_.':
+                tokens.append(None)
+            else:
+                tokens.append(c)
+            i += 1
+        return tokens
+
+    def class_bits(self, table: dict, pos: int, letters: str) -> int:
+        key = (id(table), pos, letters)
+        bits = self.class_cache.get(key)
+        if bits is None:
+            bits = 0
+            for c in letters:
+                bits |= table.get((pos, c), 0)
+            self.class_cache[key] = bits
+        return bits
+
+    def length_bits(self, min_len: int, max_len: int) -> int:
+        bits = 0
+        for n, len_bits in self.by_length.items():
+            if min_len <= n <= max_len:
+                bits |= len_bits
+        return bits
+
+    def match_bits(self, pattern: str, min_len: int = 0, max_len: int = None) -> int:
+        """ Returns the bitset of word ids matching the pattern.
+        """
+        tokens = self.parse(pattern)
+        if max_len is None:
+            max_len = max(self.by_length, default=0)
+        n_fixed = len(tokens) - tokens.count(PATTERN_STAR)
+        if not PATTERN_STAR in tokens:
+            if not min_len <= n_fixed <= max_len:
+                return 0 # PUNCH-OUT
+            bits = self.by_length.get(n_fixed, 0)
+            for pos, tok in enumerate(tokens):
+                if bits == 0:
+                    break
+                if tok is not None:
+                    bits &= self.class_bits(self.by_position, pos, tok)
+            return bits
+
+        first_star = tokens.index(PATTERN_STAR)
+        last_star = len(tokens) - 1 - tokens[::-1].index(PATTERN_STAR)
+        prefix = tokens[:first_star]
+        suffix = tokens[last_star+1:]
+        middle = tokens[first_star+1:last_star]
+        bits = self.length_bits(max(min_len, n_fixed), max_len)
+        for pos, tok in enumerate(prefix):
+            if tok is not None and bits:
+                bits &= self.class_bits(self.by_position, pos, tok)
+        for rpos, tok in enumerate(reversed(suffix)):
+            if tok is not None and bits:
+                bits &= self.class_bits(self.by_rposition, rpos, tok)
+        for tok in middle:
+            if tok is not None and tok != PATTERN_STAR and len(tok) == 1 and bits:
+                # A fixed letter in the middle must at least appear somewhere in the word.
+                bits &= self.by_letter.get(tok, 0)
+        if bits and any([tok != PATTERN_STAR for tok in middle]):
+            # Only the middle of the pattern (between the outermost stars) needs verifying.
+            regex = re.compile(self.regex(tokens))
+            verified = 0
+            for word_id in bits_to_ids(bits):
+                if regex.fullmatch(self.words[word_id].word):
+                    verified |= 1 << word_id
+            bits = verified
+        return bits
+
+    @staticmethod
+    def regex(tokens: list) -> str:
+        parts = list()
+        for tok in tokens:
+            if tok == PATTERN_STAR:
+                parts.append('.*')
+            elif tok is None:
+                parts.append('.')
+            elif len(tok) == 1:
+                parts.append(re.escape(tok))
+            else:
+                parts.append('[' + ''.join(map(re.escape, tok)) + ']')
+        return ''.join(parts)
+
+    def match(self, pattern: str, min_len: int = 0, max_len: int = None) -> list[Word]:
+        return [self.words[i] for i in bits_to_ids(self.match_bits(pattern, min_len, max_len))]
+
+    def count(self, pattern: str, min_len: int = 0, max_len: int = None) -> int:
+        return self.match_bits(pattern, min_len, max_len).bit_count()
+
+    def match_all(self, patterns: list[str], min_len: int = 0, max_len: int = None) -> dict:
+        """ Batched matching: returns a dict with each pattern as key and its list of matching Words as value.
+            The letter class bitsets are cached, so they are shared across the batch.
+        """
+        return {p: self.match(p, min_len, max_len) for p in patterns}
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList) -> object:
+        index = cls()
+        index.add_wordlist(wl)
+        return index
+
+    @classmethod
+    def for_wordlist(cls, wl: WordList) -> object:
+        """ Same as from_wordlist, cached on disk (see IndexCache). """
+        return cached_index(cls.__name__, cls.CACHE_VERSION, [wl], lambda: cls.from_wordlist(wl))
+
+# Unpickling a truncated, garbled or outdated file raises one of these.
+PICKLE_LOAD_ERRORS = (EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, TypeError, ValueError)
+
+def save_pickle(obj: object, path: str, temp_prefix: str = '.tmp-'):
+    """ Pickles obj to a temporary file beside path and renames it over path, so an
+        interrupted run never leaves a truncated file behind.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=temp_prefix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def load_pickle(path: str) -> object:
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def load_pickle_or_none(path: str) -> object:
+    """ Returns the object pickled at path, or None if the file is missing or unreadable. """
+    try:
+        return load_pickle(path)
+    except (FileNotFoundError,) + PICKLE_LOAD_ERRORS:
+        return None
+
+# The cache is per user rather than per working directory, so running from anywhere leaves nothing behind.
+INDEX_CACHE_DIR = os.environ.get('WORDGAMES_CACHE_DIR') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'wordgames')
+INDEX_CACHE_MAX_BYTES = 1 << 30
+INDEX_CACHE_SUFFIX = '.pickle'
+INDEX_CACHE_TEMP_PREFIX = '.tmp-'
+
+def wordlists_digest(*wls: WordList) -> str:
+    """ Returns the sha256 hex digest of the words of the given lists, in list order. """
+    h = hashlib.sha256()
+    for wl in wls:
+        h.update('\n'.join([w.word for w in wl.word_list]).encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+@dataclass
+class IndexCache:
+    """ An on-disk cache of derived structures (anagram dicts, stats tables, letter
+        set groupings...), so that a second run can skip building them.
+        Each entry is a pickle keyed by (builder name, builder version, digest of
+        the input words), so an entry can never be stale: changing the words or
+        bumping the builder's version just makes a new key.
+          - Entries are written to a temporary file and renamed into place, so a
+            reader sees either a whole entry or none.
+          - Hits touch the entry's mtime; once the directory is over max_bytes the
+            entries used least recently are removed first.
+          - Another process may evict an entry at any time, so a vanished or
+            unreadable entry is treated as a miss and rebuilt.
+        Every load unpickles a fresh object, so callers may modify what they get.
+    """
+    directory: str = INDEX_CACHE_DIR
+    max_bytes: int = INDEX_CACHE_MAX_BYTES
+    enabled: bool = True
+
+    def entry_path(self, builder: str, version: int, digest: str) -> str:
+        return os.path.join(self.directory, f'{builder}-v{version}-{digest}{INDEX_CACHE_SUFFIX}')
+
+    def load(self, path: str) -> object:
+        """ Returns the cached object, or None on a miss. """
+        obj = load_pickle_or_none(path)
+        if obj is None:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return obj
+
+    def store(self, path: str, obj: object):
+        os.makedirs(self.directory, exist_ok=True)
+        save_pickle(obj, path, INDEX_CACHE_TEMP_PREFIX)
+        self.evict()
+
+    def entries(self) -> list[tuple]:
+        """ Returns (mtime, size, path) for each entry, least recently used first. """
+        entries = list()
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(INDEX_CACHE_SUFFIX) or name.startswith(INDEX_CACHE_TEMP_PREFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        entries = self.entries()
+        total = sum([size for _, size, _ in entries])
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def get(self, builder: str, version: int, wls: list[WordList], build) -> object:
+        """ Returns the cached result of build() for the given input word lists, calling build()
+            and caching its result on a miss.
+        """
+        if not self.enabled:
+            return build()
+        path = self.entry_path(builder, version, wordlists_digest(*wls))
+        obj = self.load(path)
+        if obj is None:
+            obj = build()
+            self.store(path, obj)
+        return obj
+
+INDEX_CACHE = IndexCache()
+
+def cached_index(builder: str, version: int, wls: list[WordList], build) -> object:
+    return INDEX_CACHE.get(builder, version, wls, build)
+
+@dataclass
+class NgramIndex:
+    """ An inverted index from every n-gram (substring of length 2 up to max_n)
+        to the postings array of ids of the words containing it, along with the
+        count of all occurrences of each n-gram. Built in a single pass over the
+        words; words are kept as plain strings so the index pickles compactly.
+        E.g. in KUKUS the word count of 'KU' is 1 and the occurrence count is 2,
+        matching WordList.digraphs_by_word() and digraphs_by_occurrence().
+    """
+    CACHE_VERSION = 1
+    max_n: int = 3
+    words: list = field(default_factory=list)        # word id -> str
+    postings: dict = field(default_factory=dict)     # gram -> array of word ids
+    occurrences: dict = field(default_factory=dict)  # gram -> occurrence count
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add_wordlist(self, wl: WordList):
+        lists = {g: p.tolist() for g, p in self.postings.items()}
+        occurrences = self.occurrences
+        for word_id, w in enumerate(wl.word_list, len(self.words)):
+            s = w.word
+            self.words.append(s)
+            grams = set()
+            for n in range(2, self.max_n + 1):
+                for i in range(len(s) - n + 1):
+                    g = s[i:i+n]
+                    occurrences[g] = occurrences.get(g, 0) + 1
+                    grams.add(g)
+            for g in grams:
+                l = lists.get(g)
+                if l is None:
+                    l = list()
+                    lists[g] = l
+                l.append(word_id)
+        self.postings = {g: array('I', l) for g, l in lists.items()}
+
+    def word_count(self, gram: str) -> int:
+        p = self.postings.get(gram.upper())
+        return 0 if p is None else len(p)
+
+    def occurrence_count(self, gram: str) -> int:
+        return self.occurrences.get(gram.upper(), 0)
+
+    def counts_by_word(self, n: int = 2) -> dict:
+        return {g: len(p) for g, p in self.postings.items() if len(g) == n}
+
+    def counts_by_occurrence(self, n: int = 2) -> dict:
+        return {g: count for g, count in self.occurrences.items() if len(g) == n}
+
+    def lists_by_word(self, n: int = 2) -> dict:
+        return {g: [self.words[i] for i in p] for g, p in self.postings.items() if len(g) == n}
+
+    def ids_containing(self, sub: str) -> list[int]:
+        """ Returns the ids of words containing the substring, in ascending order.
+            Substrings no longer than max_n are a single postings lookup. Longer
+            substrings intersect the postings of their max_n-grams (smallest first)
+            and then verify the survivors.
+        """
+        sub = sub.upper()
+        if len(sub) < 2:
+            return [i for i, s in enumerate(self.words) if sub in s]
+        if len(sub) <= self.max_n:
+            return list(self.postings.get(sub, ()))
+        n = self.max_n
+        plists = [self.postings.get(sub[i:i+n], ()) for i in range(len(sub) - n + 1)]
+        plists.sort(key=len)
+        ids = set(plists[0])
+        for p in plists[1:]:
+            if len(ids) == 0:
+                break
+            ids.intersection_update(p)
+        return sorted([i for i in ids if sub in self.words[i]])
+
+    def words_containing(self, sub: str) -> list[str]:
+        return [self.words[i] for i in self.ids_containing(sub)]
+
+    def save(self, path: str):
+        save_pickle(self, path)
+
+    @classmethod
+    def load(cls, path: str) -> object:
+        return load_pickle(path)
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList, max_n: int = 3) -> object:
+        index = cls(max_n)
+        index.add_wordlist(wl)
+        return index
+
+    @classmethod
+    def for_wordlist(cls, wl: WordList, max_n: int = 3) -> object:
+        """ Same as from_wordlist, cached on disk (see IndexCache). """
+        return cached_index(f'{cls.__name__}{max_n}', cls.CACHE_VERSION, [wl], lambda: cls.from_wordlist(wl, max_n))
+
+    @classmethod
+    def for_file(cls, path: str, max_n: int = 3) -> object:
+        """ The index of the word list file at path, cached on disk by its words. """
+        return cls.for_wordlist(get_corpus(path), max_n)
+
+NEIGHBOR_POS_BITS = 6 # deletion positions are packed into the low bits of each posting: id << 6 | pos
+NEIGHBOR_MAX_LEN = 1 << NEIGHBOR_POS_BITS # so no word may be longer than this
+
+@dataclass
+class NeighborhoodIndex:
+    """ One-letter neighborhoods by deletion-signature hashing (as in SymSpell):
+        every word is posted under each string formed by deleting one of its
+        letters, along with the position deleted. Then for a word s:
+          - deleting a letter: probe the word ids for each deletion of s
+          - inserting a letter: the words posted under s itself
+          - substituting a letter: the words posted under a deletion of s at the same position
+        Words are kept as plain strings so the index pickles compactly, and can be
+        cached on disk (see IndexCache).
+    """
+    CACHE_VERSION = 1
+    words: list = field(default_factory=list)      # word id -> str
+    word_ids: dict = field(default_factory=dict, repr=False)   # str -> word id
+    keys: list = field(default_factory=list, repr=False)       # deletion strings
+    slots: dict = field(default_factory=dict, repr=False)      # deletion str -> index into keys
+    offsets: array = field(default_factory=lambda: array('I', [0]), repr=False)
+    postings: array = field(default_factory=lambda: array('I'), repr=False) # (id << 6 | pos), grouped by key
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __getstate__(self) -> dict:
+        # The dicts are rebuilt on load, which is much quicker than unpickling them.
+        return {'words': self.words, 'keys': self.keys, 'offsets': self.offsets, 'postings': self.postings}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.word_ids = {s: i for i, s in enumerate(self.words)}
+        self.slots = {k: i for i, k in enumerate(self.keys)}
+
+    def deleted(self, key: str):
+        """ Returns the postings (id << 6 | pos) of the words having key as a one-letter deletion. """
+        slot = self.slots.get(key)
+        if slot is None:
+            return ()
+        return self.postings[self.offsets[slot]:self.offsets[slot+1]]
+
+    def add_wordlist(self, wl: WordList):
+        for w in wl.word_list:
+            if len(w.word) > NEIGHBOR_MAX_LEN:
+                raise ValueError(f"Words longer than {NEIGHBOR_MAX_LEN} letters can't be indexed: {w.word}")
+        lists = {k: self.deleted(k).tolist() for k in self.keys}
+        for w in wl.word_list:
+            s = w.word
+            if s in self.word_ids:
+                continue
+            word_id = len(self.words)
+            self.words.append(s)
+            self.word_ids[s] = word_id
+            for i in range(len(s)):
+                key = s[:i] + s[i+1:]
+                l = lists.get(key)
+                if l is None:
+                    l = list()
+                    lists[key] = l
+                l.append(word_id << NEIGHBOR_POS_BITS | i)
+        # Pack the postings lists into one compressed (CSR-style) array.
+        self.keys = list(lists)
+        self.slots = {k: i for i, k in enumerate(self.keys)}
+        self.offsets = array('I', [0])
+        self.postings = array('I')
+        for k in self.keys:
+            self.postings.extend(lists[k])
+            self.offsets.append(len(self.postings))
+
+    def contains(self, s: str) -> bool:
+        return s.upper() in self.word_ids
+
+    def deletions(self, s: str) -> list[str]:
+        """ Words formed by deleting one letter from s. """
+        s = s.upper()
+        found = set([s[:i] + s[i+1:] for i in range(len(s))])
+        return sorted([d for d in found if d in self.word_ids])
+
+    def insertions(self, s: str) -> list[str]:
+        """ Words formed by inserting one letter into s. """
+        return sorted(set([self.words[p >> NEIGHBOR_POS_BITS] for p in self.deleted(s.upper())]))
+
+    def substitutions(self, s: str) -> list[str]:
+        """ Words formed by changing one letter of s. """
+        s = s.upper()
+        found = set()
+        mask = (1 << NEIGHBOR_POS_BITS) - 1
+        for i in range(len(s)):
+            for p in self.deleted(s[:i] + s[i+1:]):
+                if p & mask == i:
+                    found.add(self.words[p >> NEIGHBOR_POS_BITS])
+        found.discard(s)
+        return sorted(found)
+
+    def neighbors(self, s: str) -> list[str]:
+        """ All words reachable from s by inserting, deleting or substituting one letter. """
+        return sorted(set(self.deletions(s)) | set(self.insertions(s)) | set(self.substitutions(s)))
+
+    def deletion_pairs(self, shorter: object, length: int = None) -> list[tuple]:
+        """ Bulk join against another NeighborhoodIndex (or WordList) of shorter words:
+            returns sorted (word, position, shorter word) tuples for every word in this
+            index (of the given length, if given) which becomes a word of the shorter
+            lexicon by deleting the letter at position.
+        """
+        if isinstance(shorter, NeighborhoodIndex):
+            shorter_words = shorter.word_ids
+        else:
+            shorter_words = set([w.word for w in shorter.word_list])
+        mask = (1 << NEIGHBOR_POS_BITS) - 1
+        pairs = list()
+        # Join on the smaller of the two key sets.
+        if len(shorter_words) < len(self.slots):
+            keys = [k for k in shorter_words if k in self.slots]
+        else:
+            keys = [k for k in self.keys if k in shorter_words]
+        for key in keys:
+            for p in self.deleted(key):
+                s = self.words[p >> NEIGHBOR_POS_BITS]
+                if length is None or len(s) == length:
+                    pairs.append((s, p & mask, key))
+        pairs.sort()
+        return pairs
+
+    def save(self, path: str):
+        save_pickle(self, path)
+
+    @classmethod
+    def load(cls, path: str) -> object:
+        return load_pickle(path)
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList) -> object:
+        index = cls()
+        index.add_wordlist(wl)
+        return index
+
+    @classmethod
+    def for_wordlist(cls, wl: WordList) -> object:
+        """ Same as from_wordlist, cached on disk (see IndexCache). """
+        return cached_index(cls.__name__, cls.CACHE_VERSION, [wl], lambda: cls.from_wordlist(wl))
+
+    @classmethod
+    def for_file(cls, path: str) -> object:
+        """ The index of the word list file at path, cached on disk by its words. """
+        return cls.for_wordlist(get_corpus(path))
+
+@dataclass
+class WordLadderGraph:
+    """ The word ladder graph for words of a single length: two words are joined
+        when they differ by exactly one letter in the same position. Edges are
+        found through wildcard buckets (CAT and COT are both in bucket "C?T"),
+        and the adjacency is stored compressed (CSR): the neighbors of word id i
+        are neighbors[offsets[i]:offsets[i+1]].
+    """
+    CACHE_VERSION = 1
+    length: int = 5
+    words: list = field(default_factory=list)                          # word id -> str
+    word_ids: dict = field(default_factory=dict, repr=False)           # str -> word id
+    offsets: array = field(default_factory=lambda: array('I', [0]), repr=False)
+    neighbors: array = field(default_factory=lambda: array('I'), repr=False)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __getstate__(self) -> dict:
+        return {'length': self.length, 'words': self.words, 'offsets': self.offsets, 'neighbors': self.neighbors}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.word_ids = {s: i for i, s in enumerate(self.words)}
+
+    def build(self, wl: WordList):
+        self.words = sorted(set([w.word for w in wl.word_list if len(w.word) == self.length]))
+        self.word_ids = {s: i for i, s in enumerate(self.words)}
+        buckets = dict()
+        for word_id, s in enumerate(self.words):
+            for i in range(self.length):
+                buckets.setdefault(s[:i] + '?' + s[i+1:], []).append(word_id)
+        adjacency = [list() for _ in self.words]
+        for bucket in buckets.values():
+            if len(bucket) > 1:
+                for word_id in bucket:
+                    adjacency[word_id].extend([other for other in bucket if other != word_id])
+        self.offsets = array('I', [0])
+        self.neighbors = array('I')
+        for adj in adjacency:
+            adj.sort()
+            self.neighbors.extend(adj)
+            self.offsets.append(len(self.neighbors))
+
+    def neighbors_of(self, word_id: int):
+        return self.neighbors[self.offsets[word_id]:self.offsets[word_id+1]]
+
+    def degree(self, word_id: int) -> int:
+        return self.offsets[word_id+1] - self.offsets[word_id]
+
+    def shortest_ladder(self, start: str, end: str) -> list[str]:
+        """ Returns a shortest ladder from start to end (inclusive) as a list of words,
+            or None if there isn't one. Searches from both ends at once, always
+            expanding the smaller frontier by one level.
+        """
+        a = self.word_ids.get(start.upper())
+        b = self.word_ids.get(end.upper())
+        if a is None or b is None:
+            return None # PUNCH-OUT
+        if a == b:
+            return [self.words[a]]
+        parents_a = {a: -1}
+        parents_b = {b: -1}
+        frontier_a = [a]
+        frontier_b = [b]
+        meet = -1
+        while frontier_a and frontier_b and meet < 0:
+            if len(frontier_a) > len(frontier_b):
+                frontier_a, frontier_b = frontier_b, frontier_a
+                parents_a, parents_b = parents_b, parents_a
+            next_frontier = list()
+            for u in frontier_a:
+                for v in self.neighbors_of(u):
+                    if not v in parents_a:
+                        parents_a[v] = u
+                        if v in parents_b:
+                            meet = v
+                            break
+                        next_frontier.append(v)
+                if meet >= 0:
+                    break
+            frontier_a = next_frontier
+        if meet < 0:
+            return None
+        half_a = list()
+        v = meet
+        while v >= 0:
+            half_a.append(v)
+            v = parents_a[v]
+        half_b = list()
+        v = parents_b[meet]
+        while v >= 0:
+            half_b.append(v)
+            v = parents_b[v]
+        path = half_a[::-1] + half_b
+        if path[0] != a:
+            path.reverse()
+        return [self.words[i] for i in path]
+
+    def distances(self, source: int) -> array:
+        """ Breadth-first distances from the source word id (-1 where unreachable). """
+        dist = array('i', [-1]) * len(self.words)
+        dist[source] = 0
+        frontier = [source]
+        d = 0
+        while frontier:
+            d += 1
+            next_frontier = list()
+            for u in frontier:
+                for v in self.neighbors_of(u):
+                    if dist[v] < 0:
+                        dist[v] = d
+                        next_frontier.append(v)
+            frontier = next_frontier
+        return dist
+
+    def components(self) -> list[list[int]]:
+        """ Returns the connected components as lists of word ids, largest first. """
+        seen = bytearray(len(self.words))
+        components = list()
+        for root in range(len(self.words)):
+            if not seen[root]:
+                seen[root] = 1
+                component = [root]
+                for u in component: # grows as we go
+                    for v in self.neighbors_of(u):
+                        if not seen[v]:
+                            seen[v] = 1
+                            component.append(v)
+                components.append(component)
+        components.sort(key=len, reverse=True)
+        return components
+
+    def component_diameter(self, component: list[int]) -> tuple:
+        """ Returns (diameter, start word, end word) for a connected component.
+            Uses the BoundingDiameters algorithm (Takes & Kosters): each BFS tightens
+            lower and upper eccentricity bounds for every node, and nodes whose
+            bounds can no longer change the answer are dropped, so only a handful
+            of the component's nodes ever need a BFS of their own.
+        """
+        if len(component) == 1:
+            return 0, self.words[component[0]], self.words[component[0]] # PUNCH-OUT
+        candidates = set(component)
+        ecc_lower = dict.fromkeys(component, 0)
+        ecc_upper = dict.fromkeys(component, len(component))
+        best = (0, component[0], component[0])
+        high = True
+        while candidates:
+            if high:
+                v = max(candidates, key=lambda w: (ecc_upper[w], self.degree(w)))
+            else:
+                v = min(candidates, key=lambda w: (ecc_lower[w], -self.degree(w)))
+            high = not high
+            dist = self.distances(v)
+            ecc = max([dist[w] for w in component])
+            if ecc > best[0]:
+                far = max(component, key=lambda w: dist[w])
+                best = (ecc, v, far)
+            candidates.discard(v)
+            ecc_lower[v] = ecc_upper[v] = ecc
+            for w in candidates:
+                d = dist[w]
+                ecc_lower[w] = max(ecc_lower[w], d, ecc - d)
+                ecc_upper[w] = min(ecc_upper[w], ecc + d)
+            diam_lower = best[0]
+            diam_upper = max([ecc_upper[w] for w in candidates], default=diam_lower)
+            if diam_upper <= diam_lower:
+                break
+            candidates = set([w for w in candidates
+                              if not ((ecc_upper[w] <= diam_lower and ecc_lower[w] >= diam_upper / 2)
+                                      or ecc_lower[w] == ecc_upper[w])])
+        return best[0], self.words[best[1]], self.words[best[2]]
+
+    def diameter(self) -> tuple:
+        """ Returns (diameter, start word, end word), the longest shortest ladder over all components. """
+        best = (0, '', '')
+        for component in self.components():
+            if len(component) - 1 <= best[0]:
+                break # a component this small can't have a longer ladder
+            d = self.component_diameter(component)
+            if d[0] > best[0]:
+                best = d
+        return best
+
+    def save(self, path: str):
+        save_pickle(self, path)
+
+    @classmethod
+    def load(cls, path: str) -> object:
+        return load_pickle(path)
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList, length: int = 5) -> object:
+        graph = cls(length)
+        graph.build(wl)
+        return graph
+
+    @classmethod
+    def for_wordlist(cls, wl: WordList, length: int = 5) -> object:
+        """ Same as from_wordlist, cached on disk (see IndexCache). """
+        return cached_index(f'{cls.__name__}{length}', cls.CACHE_VERSION, [wl], lambda: cls.from_wordlist(wl, length))
+
+    @classmethod
+    def for_file(cls, path: str, length: int = 5) -> object:
+        """ The graph of the word list file at path, cached on disk by its words. """
+        return cls.for_wordlist(get_corpus(path), length)
+
+@dataclass
+class SuffixIndex:
+    """ The words of a word list, reversed and sorted, so that all the words
+        ending with a given suffix form one contiguous run found by binary search
+        (the reversed suffix is a prefix of each of them). Reversal pairs and
+        palindromes are bulk set operations on the strings, so no temporary
+        Word objects are created.
+    """
+    reversed_words: list = field(default_factory=list, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.reversed_words)
+
+    def add_wordlist(self, wl: WordList):
+        self.reversed_words.extend([w.word[::-1] for w in wl.word_list])
+        self.reversed_words = sorted(set(self.reversed_words))
+
+    def reversed_range(self, suffix: str) -> tuple:
+        rs = suffix.upper()[::-1]
+        lo = bisect.bisect_left(self.reversed_words, rs)
+        # No letter sorts after the last code point, so this bounds every word starting with rs.
+        hi = bisect.bisect_left(self.reversed_words, rs + chr(sys.maxunicode), lo)
+        return lo, hi
+
+    def count_ending_with(self, suffix: str) -> int:
+        lo, hi = self.reversed_range(suffix)
+        return hi - lo
+
+    def ending_with(self, suffix: str) -> list[str]:
+        """ Returns the sorted list of words ending with the suffix, e.g. "IGHT". """
+        lo, hi = self.reversed_range(suffix)
+        return sorted([rs[::-1] for rs in self.reversed_words[lo:hi]])
+
+    def rhymes(self, word: str, n: int = 3) -> list[str]:
+        """ Words (other than word itself) sharing the last n letters of word. """
+        s = word.upper()
+        return [w for w in self.ending_with(s[-n:]) if w != s]
+
+    def palindromes(self) -> list[str]:
+        return sorted([rs for rs in self.reversed_words if rs == rs[::-1]])
+
+    def reversal_pairs(self) -> list[tuple]:
+        """ Returns the sorted list of (word, reversed word) pairs where both are in the list,
+            each pair once (word < reversed word), not counting palindromes.
+        """
+        both = set(self.reversed_words).intersection([rs[::-1] for rs in self.reversed_words])
+        return sorted([(s, s[::-1]) for s in both if s < s[::-1]])
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList) -> object:
+        index = cls()
+        index.add_wordlist(wl)
+        return index
+
+@dataclass
+class IsomorphIndex:
+    """ Words grouped by their letter pattern (see letter_pattern), e.g. LEVEL,
+        RADAR and REFER all share ABCBA. Words in the same group are isomorphs:
+        one can be turned into the other by a consistent letter substitution,
+        which is exactly what a cryptogram does to its plaintext words.
+    """
+    patterns: dict = field(default_factory=dict) # pattern -> list of word strs
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def add_wordlist(self, wl: WordList):
+        for w in wl.word_list:
+            self.patterns.setdefault(letter_pattern(w.word), []).append(w.word)
+
+    def isomorphs(self, s: str) -> list[str]:
+        return self.patterns.get(letter_pattern(s.upper()), [])
+
+    def heterograms(self, length: int) -> list[str]:
+        return self.patterns.get(''.join(ALPHABET_LIST[:length]), [])
+
+    def pattern_counts(self) -> dict:
+        return {p: len(l) for p, l in self.patterns.items()}
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList) -> object:
+        index = cls()
+        index.add_wordlist(wl)
+        return index
+
+@dataclass
+class CryptogramSolver:
+    """ Solves simple substitution ciphers. Each cipher word's candidates are
+        the words with the same letter pattern. The search assigns the cipher
+        word with the fewest candidates still consistent with the cipher-to-plain
+        letter mapping so far, then filters every other word's candidates against
+        the extended mapping, backing up as soon as any cipher word has none left.
+    """
+    index: IsomorphIndex = field(default_factory=IsomorphIndex, repr=False)
+    no_fixed_letters: bool = False # if True, no letter may stand for itself (as in most published cryptograms)
+
+    @staticmethod
+    def consistent(cipher: str, plain: str, mapping: dict, reverse: dict) -> bool:
+        for c, p in zip(cipher, plain):
+            if mapping.get(c, p) != p or reverse.get(p, c) != c:
+                return False
+        return True
+
+    def candidates(self, cipher: str) -> list[str]:
+        words = self.index.isomorphs(cipher)
+        if self.no_fixed_letters:
+            words = [w for w in words if all([c != p for c, p in zip(cipher, w)])]
+        return words
+
+    def solve(self, ciphertext: str, max_solutions: int = 10) -> list[tuple]:
+        """ Returns up to max_solutions (plaintext, mapping) tuples, where mapping is a dict of
+            cipher letter -> plain letter. Non-letters in the ciphertext are kept as they are.
+        """
+        ciphertext = ciphertext.upper()
+        cipher_words = sorted(set(re.findall('[A-Z]+', ciphertext)), key=len, reverse=True)
+        solutions = list()
+
+        def search(remaining: dict, mapping: dict, reverse: dict):
+            if len(solutions) >= max_solutions:
+                return
+            if len(remaining) == 0:
+                plaintext = ''.join([mapping.get(c, c) for c in ciphertext])
+                solutions.append((plaintext, dict(mapping)))
+                return
+            cipher = min(remaining, key=lambda cw: len(remaining[cw]))
+            others = {cw: l for cw, l in remaining.items() if cw != cipher}
+            for plain in remaining[cipher]:
+                new_mapping = dict(mapping)
+                new_reverse = dict(reverse)
+                for c, p in zip(cipher, plain):
+                    new_mapping[c] = p
+                    new_reverse[p] = c
+                filtered = dict()
+                for cw, l in others.items():
+                    filtered[cw] = [w for w in l if self.consistent(cw, w, new_mapping, new_reverse)]
+                    if len(filtered[cw]) == 0:
+                        break
+                else:
+                    search(filtered, new_mapping, new_reverse)
+
+        search({cw: self.candidates(cw) for cw in cipher_words}, dict(), dict())
+        return solutions
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList, no_fixed_letters: bool = False) -> object:
+        return cls(IsomorphIndex.from_wordlist(wl), no_fixed_letters)
+
+ALL_LETTERS_MASK = (1 << 26) - 1
+
+def mask_letters(mask: int) -> str:
+    return ''.join([c for c in ALPHABET_LIST if CHAR_BITMASK[c] & mask])
+
+@dataclass
+class DisjointLetterSetSearch:
+    """ Finds k heterograms with pairwise disjoint letter sets that together cover
+        a target alphabet (or at least min_coverage letters of it), e.g. the
+        classic five 5-letter words using 25 distinct letters.
+        Words are deduplicated to their letter_set_mask (anagrams share a mask)
+        and the search works on masks:
+          - the next letter to cover is always the rarest one not yet covered;
+          - any solution either uses exactly one word containing that letter, or
+            leaves it uncovered, which spends one of the |target| - min_coverage
+            letters that may go uncovered;
+          - dead ends are memoized on (letters used or skipped, skips left, words
+            chosen), since how we got there doesn't matter;
+          - the branches for the first letter can be split across processes.
+    """
+    mask_words: dict = field(default_factory=dict)   # mask -> list of Words
+    letter_masks: dict = field(default_factory=dict, repr=False) # letter bit -> list of masks containing it
+    letter_order: list = field(default_factory=list, repr=False) # letter bits, rarest first
+
+    def add_wordlist(self, wl: WordList, length: int = None):
+        for w in wl.word_list:
+            if w.is_heterogram() and w.word.isalpha() and (length is None or len(w.word) == length):
+                self.mask_words.setdefault(w.letter_set_mask, []).append(w)
+        self.letter_masks = {bit: list() for bit in CHAR_BITMASK.values()}
+        for mask in self.mask_words:
+            for bit in CHAR_BITMASK.values():
+                if mask & bit:
+                    self.letter_masks[bit].append(mask)
+        self.letter_order = sorted(CHAR_BITMASK.values(), key=lambda bit: (len(self.letter_masks[bit]), bit))
+
+    def next_letter(self, target: int, blocked: int) -> int:
+        for bit in self.letter_order:
+            if target & bit and not blocked & bit:
+                return bit
+        return 0
+
+    def search(self, k: int, target: int, min_coverage: int, used: int, skipped: int, skips_left: int,
+               chosen: list, solutions: list, dead: set) -> bool:
+        if len(chosen) == k:
+            if (used & target).bit_count() >= min_coverage:
+                solutions.append(tuple(chosen))
+                return True
+            return False
+        blocked = used | skipped
+        bit = self.next_letter(target, blocked)
+        if bit == 0:
+            return False
+        key = (blocked, skips_left, len(chosen))
+        if key in dead:
+            return False
+        found = False
+        for mask in self.letter_masks[bit]:
+            if not mask & blocked and not mask & ~target:
+                chosen.append(mask)
+                if self.search(k, target, min_coverage, used | mask, skipped, skips_left, chosen, solutions, dead):
+                    found = True
+                chosen.pop()
+        if skips_left > 0:
+            if self.search(k, target, min_coverage, used, skipped | bit, skips_left - 1, chosen, solutions, dead):
+                found = True
+        if not found:
+            dead.add(key)
+        return found
+
+    def search_branch(self, args: tuple) -> list:
+        k, target, min_coverage, first_mask, skipped, skips_left = args
+        solutions = list()
+        chosen = [] if first_mask == 0 else [first_mask]
+        self.search(k, target, min_coverage, first_mask, skipped, skips_left, chosen, solutions, set())
+        return solutions
+
+    def mask_solutions(self, k: int, target_letters: str = None, min_coverage: int = None, processes: int = 1) -> list:
+        """ Returns the sorted list of solutions, each a sorted tuple of k masks. """
+        target = ALL_LETTERS_MASK if target_letters is None else Word(target_letters).letter_set_mask
+        n_target = target.bit_count()
+        if min_coverage is None:
+            min_coverage = n_target
+        skips_left = n_target - min_coverage
+        if processes <= 1:
+            solutions = list()
+            self.search(k, target, min_coverage, 0, 0, skips_left, [], solutions, set())
+        else:
+            # Split the top level: one branch per word containing the first (rarest) letter, plus skipping it.
+            bit = self.next_letter(target, 0)
+            branches = [(k, target, min_coverage, mask, 0, skips_left)
+                        for mask in self.letter_masks.get(bit, []) if not mask & ~target]
+            if skips_left > 0:
+                branches.append((k, target, min_coverage, 0, bit, skips_left - 1))
+            solutions = list()
+            with multiprocessing.Pool(processes, disjoint_search_worker_init, (self,)) as pool:
+                for branch_solutions in pool.imap_unordered(disjoint_search_branch, branches, chunksize=16):
+                    solutions.extend(branch_solutions)
+        return sorted([tuple(sorted(s)) for s in solutions])
+
+    def best_coverage(self, k: int, target_letters: str = None, processes: int = 1) -> tuple:
+        """ Returns (coverage, mask solutions) for the largest coverage of the target that k words can reach. """
+        target = ALL_LETTERS_MASK if target_letters is None else Word(target_letters).letter_set_mask
+        longest = max([mask.bit_count() for mask in self.mask_words], default=0)
+        for coverage in range(min(target.bit_count(), k * longest), 0, -1):
+            solutions = self.mask_solutions(k, target_letters, coverage, processes)
+            if solutions:
+                return coverage, solutions
+        return 0, []
+
+    def word_solutions(self, mask_solution: tuple) -> list[tuple]:
+        """ Expands a solution of masks into every combination of the words having those masks. """
+        return list(itertools.product(*[self.mask_words[mask] for mask in mask_solution]))
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList, length: int = None) -> object:
+        search = cls()
+        search.add_wordlist(wl, length)
+        return search
+
+# Each worker process gets its own copy of the search once, rather than with every branch.
+disjoint_search_worker = None
+
+def disjoint_search_worker_init(search: DisjointLetterSetSearch):
+    global disjoint_search_worker
+    disjoint_search_worker = search
+
+def disjoint_search_branch(args: tuple) -> list:
+    return disjoint_search_worker.search_branch(args)
+
+OVERLAP_COUNT = 'overlap'         # letters in common
+OVERLAP_JACCARD = 'jaccard'       # letters in common / letters in either
+OVERLAP_CONTAINMENT = 'containment' # letters in common / letters in the query
+
+@dataclass
+class LetterOverlapIndex:
+    """ Ranks words by how many letters their letter sets share with a query.
+        Words are grouped by letter_set_mask, so each distinct set is scored once
+        with an AND and a popcount, and the scores are spread back to the words.
+        For all-pairs searches the masks are blocked on their min_overlap-letter
+        subsets: two sets sharing at least that many letters must meet in the
+        block of the alphabetically first such subset of their intersection,
+        which is the only block the pair is reported from.
+    """
+    mask_words: dict = field(default_factory=dict)   # mask -> list of Words, sorted
+    masks: list = field(default_factory=list, repr=False)
+
+    def __len__(self) -> int:
+        return sum([len(words) for words in self.mask_words.values()])
+
+    def add_wordlist(self, wl: WordList):
+        for w in wl.word_list:
+            self.mask_words.setdefault(w.letter_set_mask, []).append(w)
+        for words in self.mask_words.values():
+            words.sort()
+        self.masks = list(self.mask_words.keys())
+
+    @staticmethod
+    def mask_score(query_mask: int, mask: int, metric: str = OVERLAP_COUNT):
+        common = (query_mask & mask).bit_count()
+        if metric == OVERLAP_JACCARD:
+            either = (query_mask | mask).bit_count()
+            return common / either if either else 0.0
+        elif metric == OVERLAP_CONTAINMENT:
+            n = query_mask.bit_count()
+            return common / n if n else 0.0
+        elif metric != OVERLAP_COUNT:
+            raise ValueError(f'Unknown overlap metric: {metric}')
+        return common
+
+    def top_k(self, query: str, k: int = 10, metric: str = OVERLAP_COUNT, exclude_query: bool = True) -> list[tuple]:
+        """ Returns the k best (word, score) pairs for the query's letters, best first,
+            with ties broken by word.
+        """
+        query_mask = Word(query).letter_set_mask
+        query_str = query.upper()
+        ranked = sorted([(-self.mask_score(query_mask, mask, metric), mask) for mask in self.masks])
+        result = list()
+        i = 0
+        while i < len(ranked) and len(result) < k:
+            # Gather every mask tied at this score, so that ties are broken by word.
+            score = ranked[i][0]
+            tied = list()
+            while i < len(ranked) and ranked[i][0] == score:
+                tied.extend(self.mask_words[ranked[i][1]])
+                i += 1
+            tied.sort()
+            for w in tied:
+                if exclude_query and w.word == query_str:
+                    continue
+                result.append((w, -score))
+                if len(result) == k:
+                    break
+        return result
+
+    def top_k_many(self, queries: list[str], k: int = 10, metric: str = OVERLAP_COUNT) -> dict:
+        """ Returns a dict of query -> top_k results; queries with the same letter set are ranked once. """
+        by_mask = dict()
+        results = dict()
+        for q in queries:
+            mask = Word(q).letter_set_mask
+            ranked = by_mask.get(mask)
+            if ranked is None:
+                ranked = self.top_k(q, k + 1, metric, exclude_query=False)
+                by_mask[mask] = ranked
+            q_str = q.upper()
+            results[q] = [(w, score) for w, score in ranked if w.word != q_str][:k]
+        return results
+
+    def overlapping(self, query: str, min_overlap: int) -> list[tuple]:
+        """ Returns (word, letters in common) for every word sharing at least min_overlap letters, sorted by word. """
+        query_mask = Word(query).letter_set_mask
+        result = list()
+        for mask in self.masks:
+            common = (query_mask & mask).bit_count()
+            if common >= min_overlap:
+                result.extend([(w, common) for w in self.mask_words[mask]])
+        result.sort()
+        return result
+
+    def mask_pairs(self, min_overlap: int):
+        """ Yields (mask a, mask b, letters in common) for every pair of distinct masks sharing
+            at least min_overlap letters.
+        """
+        blocks = dict()
+        for mask in self.masks:
+            bits = [bit for bit in CHAR_BITMASK.values() if mask & bit]
+            for combo in itertools.combinations(bits, min_overlap):
+                blocks.setdefault(sum(combo), []).append(mask)
+        for block_key, block in blocks.items():
+            for i in range(len(block)):
+                a = block[i]
+                for b in block[i+1:]:
+                    common = a & b
+                    # Only report the pair from the block of the lowest min_overlap letters they share.
+                    first = 0
+                    rest = common
+                    for _ in range(min_overlap):
+                        low = rest & -rest
+                        first |= low
+                        rest ^= low
+                    if first == block_key:
+                        yield a, b, common.bit_count()
+
+    def all_pairs(self, min_overlap: int) -> list[tuple]:
+        """ Returns (word a, word b, letters in common) for every pair of words with a < b sharing
+            at least min_overlap letters, sorted.
+        """
+        pairs = list()
+        for mask, words in self.mask_words.items():
+            if mask.bit_count() >= min_overlap:
+                n = mask.bit_count()
+                pairs.extend([(a, b, n) for a, b in itertools.combinations(words, 2)])
+        for a_mask, b_mask, common in self.mask_pairs(min_overlap):
+            for a in self.mask_words[a_mask]:
+                for b in self.mask_words[b_mask]:
+                    pairs.append((a, b, common) if a < b else (b, a, common))
+        pairs.sort()
+        return pairs
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList) -> object:
+        index = cls()
+        index.add_wordlist(wl)
+        return index
+
+TRIE_WORD = '$' # key in a trie node whose value is the word ending at that node
+
+@dataclass
+class PrefixTrie:
+    """ A trie of nested dicts, one level per letter, shared by the grid and board
+        solvers so that a search can stop as soon as no word starts with the letters
+        walked so far.
+    """
+    root: dict = field(default_factory=dict, repr=False)
+    n_words: int = 0
+
+    def __len__(self) -> int:
+        return self.n_words
+
+    def add(self, s: str):
+        node = self.root
+        for c in s:
+            child = node.get(c)
+            if child is None:
+                child = dict()
+                node[c] = child
+            node = child
+        if not TRIE_WORD in node:
+            node[TRIE_WORD] = s
+            self.n_words += 1
+
+    def add_wordlist(self, wl: WordList, min_len: int = 1, max_len: int = None):
+        for w in wl.word_list:
+            # Only A-Z: non-ASCII letters have no tile, bit mask or Scrabble value.
+            if min_len <= len(w.word) and (max_len is None or len(w.word) <= max_len) and w.word.isascii() and w.word.isalpha():
+                self.add(w.word)
+
+    def node(self, prefix: str) -> dict:
+        """ Returns the node reached by the prefix, or None if no word starts with it. """
+        node = self.root
+        for c in prefix:
+            node = node.get(c)
+            if node is None:
+                break
+        return node
+
+    def contains(self, s: str) -> bool:
+        node = self.node(s.upper())
+        return node is not None and TRIE_WORD in node
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList, min_len: int = 1, max_len: int = None) -> object:
+        trie = cls()
+        trie.add_wordlist(wl, min_len, max_len)
+        return trie
+
+BOGGLE_DICE = ['AAEEGN', 'ABBJOO', 'ACHOPS', 'AFFKPS', 'AOOTTW', 'CIMOTU', 'DEILRX', 'DELRVY',
+               'DISTTY', 'EEGHNW', 'EEINSU', 'EHRTVW', 'EIOSST', 'ELRTTY', 'HIMNUQ', 'HLNNRZ']
+BOGGLE_MIN_WORD_LEN = 3
+BOGGLE_JOB_SIZE = 100 # random grids rolled and solved per process pool job
+BOGGLE_MAX_ATTEMPTS = 1000000 # generate_grids gives up after rolling this many grids
+
+def boggle_word_score(s: str) -> int:
+    n = len(s)
+    if n <= 4:
+        return 1
+    elif n == 5:
+        return 2
+    elif n == 6:
+        return 3
+    elif n == 7:
+        return 5
+    return 11
+
+def parse_grid(rows: str) -> list[str]:
+    """ Converts a grid given as whitespace-separated rows, e.g. "CATS OPEN ...", into a
+        row-major list of cell strings. As on a Boggle die, Q is read as QU.
+    """
+    return ['QU' if c == 'Q' else c for c in ''.join(rows.upper().split())]
+
+@dataclass
+class BoggleSolver:
+    """ Finds every word in an N x N letter grid that can be traced through adjacent
+        (including diagonally adjacent) cells without using any cell twice. The walk
+        follows the prefix trie, so it stops the moment no word starts with the
+        letters traced so far. Cells used are tracked as a bitmask.
+    """
+    trie: PrefixTrie = field(default_factory=PrefixTrie, repr=False)
+    min_len: int = BOGGLE_MIN_WORD_LEN
+    neighbors_cache: dict = field(default_factory=dict, repr=False) # N -> list of neighbor cell lists
+
+    def neighbors(self, n: int) -> list:
+        cells = self.neighbors_cache.get(n)
+        if cells is None:
+            cells = list()
+            for r in range(n):
+                for c in range(n):
+                    cells.append([rr * n + cc for rr in range(r-1, r+2) for cc in range(c-1, c+2)
+                                  if 0 <= rr < n and 0 <= cc < n and (rr, cc) != (r, c)])
+            self.neighbors_cache[n] = cells
+        return cells
+
+    def solve(self, grid: list[str]) -> list[str]:
+        """ Returns the sorted list of words found in the grid (a row-major list of N*N cell strings). """
+        n = math.isqrt(len(grid))
+        if n * n != len(grid):
+            raise ValueError(f'Grid of {len(grid)} cells is not square.')
+        nbrs = self.neighbors(n)
+        found = set()
+        min_len = self.min_len
+
+        def walk(i: int, node: dict, used: int):
+            for c in grid[i]:
+                node = node.get(c)
+                if node is None:
+                    return
+            w = node.get(TRIE_WORD)
+            if w is not None and len(w) >= min_len:
+                found.add(w)
+            for j in nbrs[i]:
+                if not used >> j & 1:
+                    walk(j, node, used | 1 << j)
+
+        for i in range(len(grid)):
+            walk(i, self.trie.root, 1 << i)
+        return sorted(found)
+
+    def score(self, words: list[str]) -> int:
+        return sum([boggle_word_score(w) for w in words])
+
+    def random_grid(self, n: int, rng: random.Random) -> list[str]:
+        """ Rolls a grid: for 4x4 the classic dice are shuffled into place; bigger grids reuse them at random. """
+        dice = BOGGLE_DICE.copy() if n == 4 else [rng.choice(BOGGLE_DICE) for _ in range(n * n)]
+        rng.shuffle(dice)
+        return ['QU' if c == 'Q' else c for c in [rng.choice(die) for die in dice]]
+
+    def score_random_grids(self, n_grids: int, n: int = 4, seed: int = None, processes: int = None) -> list[tuple]:
+        """ Rolls and solves n_grids random grids, split across a process pool.
+            Returns a list of (grid, number of words, score) tuples, in the order rolled.
+            The same seed always yields the same grids, however many processes are used.
+        """
+        if processes is None:
+            processes = os.cpu_count()
+        # Grids are rolled in fixed-size jobs, each with its own seed drawn in order,
+        # so the grids don't depend on how many processes share the jobs.
+        rng = random.Random(seed)
+        jobs = [(n, min(BOGGLE_JOB_SIZE, n_grids - i), rng.randrange(1 << 32)) for i in range(0, n_grids, BOGGLE_JOB_SIZE)]
+        results = list()
+        if processes <= 1:
+            for job in jobs:
+                results.extend(self.score_grids_job(job))
+            return results # PUNCH-OUT
+        with multiprocessing.Pool(processes, boggle_worker_init, (self,)) as pool:
+            for job_results in pool.imap(boggle_score_grids_job, jobs):
+                results.extend(job_results)
+        return results
+
+    def score_grids_job(self, job: tuple) -> list[tuple]:
+        n, count, seed = job
+        rng = random.Random(seed)
+        results = list()
+        for _ in range(count):
+            grid = self.random_grid(n, rng)
+            words = self.solve(grid)
+            results.append((grid, len(words), self.score(words)))
+        return results
+
+    def generate_grids(self, min_words: int, max_words: int, count: int, n: int = 4,
+                       seed: int = None, processes: int = None, batch_size: int = 1000,
+                       max_attempts: int = BOGGLE_MAX_ATTEMPTS) -> list[tuple]:
+        """ Rolls batches of random grids until count grids having between min_words and
+            max_words words have been found. Returns their (grid, number of words, score) tuples.
+            Gives up once max_attempts grids have been rolled, returning the (fewer) grids found,
+            since some ranges can't be met at all (e.g. with a tiny word list).
+        """
+        rng = random.Random(seed)
+        selected = list()
+        attempts = 0
+        while len(selected) < count and attempts < max_attempts:
+            batch = min(batch_size, max_attempts - attempts)
+            attempts += batch
+            for result in self.score_random_grids(batch, n, rng.randrange(1 << 32), processes):
+                if min_words <= result[1] <= max_words and len(selected) < count:
+                    selected.append(result)
+        return selected
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList, min_len: int = BOGGLE_MIN_WORD_LEN, max_len: int = 16) -> object:
+        return cls(PrefixTrie.from_wordlist(wl, min_len, max_len), min_len)
+
+# Each worker process gets its own copy of the solver (and its trie) once, rather than with every job.
+boggle_worker = None
+
+def boggle_worker_init(solver: BoggleSolver):
+    global boggle_worker
+    boggle_worker = solver
+
+def boggle_score_grids_job(job: tuple) -> list[tuple]:
+    return boggle_worker.score_grids_job(job)
+
+SCRABBLE_SIZE = 15
+SCRABBLE_BLANK = '?'
+SCRABBLE_RACK_SIZE = 7
+SCRABBLE_BINGO_BONUS = 50
+
+# T = triple word, D = double word, t = triple letter, d = double letter.
+SCRABBLE_PREMIUMS = [
+    'T..d...T...d..T',
+    '.D...t...t...D.',
+    '..D...d.d...D..',
+    'd..D...d...D..d',
+    '....D.....D....',
+    '.t...t...t...t.',
+    '..d...d.d...d..',
+    'T..d...D...d..T',
+    '..d...d.d...d..',
+    '.t...t...t...t.',
+    '....D.....D....',
+    'd..D...d...D..d',
+    '..D...d.d...D..',
+    '.D...t...t...D.',
+    'T..d...T...d..T',
+]
+
+SCRABBLE_LETTER_VALUES = {
+    A: 1, B: 3, C: 3, D: 2, E: 1, F: 4, G: 2, H: 4, I: 1, J: 8, K: 5, L: 1, M: 3,
+    N: 1, O: 1, P: 3, Q: 10, R: 1, S: 1, T: 1, U: 1, V: 4, W: 4, X: 8, Y: 4, Z: 10
+}
+
+def scrabble_tile_value(tile: str) -> int:
+    """ Tiles played from a blank are kept in lowercase, and are worth nothing. """
+    return SCRABBLE_LETTER_VALUES.get(tile, 0)
+
+def scrabble_multipliers(row: int, col: int) -> tuple:
+    """ Returns the (letter multiplier, word multiplier) of the square. """
+    p = SCRABBLE_PREMIUMS[row][col]
+    if p == 'T':
+        return 1, 3
+    elif p == 'D':
+        return 1, 2
+    elif p == 't':
+        return 3, 1
+    elif p == 'd':
+        return 2, 1
+    return 1, 1
+
+@dataclass
+class ScrabbleMove:
+    row: int
+    col: int
+    across: bool
+    word: str             # lowercase letters are played from a blank
+    score: int = 0
+    tiles: tuple = ()     # the (row, col, tile) placements made by the move
+
+@dataclass
+class ScrabbleBoard:
+    """ A 15 x 15 board; empty squares are '', squares played from a blank hold a lowercase letter. """
+    cells: list = field(default_factory=lambda: [[''] * SCRABBLE_SIZE for _ in range(SCRABBLE_SIZE)])
+
+    def __repr__(self) -> str:
+        return '\n'.join([''.join([c if c else '.' for c in row]) for row in self.cells])
+
+    def is_empty(self) -> bool:
+        return not any([any(row) for row in self.cells])
+
+    def transposed(self) -> object:
+        return ScrabbleBoard([list(col) for col in zip(*self.cells)])
+
+    def place_word(self, row: int, col: int, across: bool, word: str):
+        for i, c in enumerate(word):
+            if across:
+                self.cells[row][col + i] = c
+            else:
+                self.cells[row + i][col] = c
+
+    def play(self, move: ScrabbleMove):
+        for r, c, tile in move.tiles:
+            self.cells[r][c] = tile
+
+    @classmethod
+    def from_rows(cls, rows: list[str]) -> object:
+        """ Builds a board from 15 strings of 15 characters, with '.' for empty squares. """
+        return cls([['' if c == '.' else c for c in row] for row in rows])
+
+@dataclass
+class ScrabbleMoveGenerator:
+    """ Generates every legal move for a board and rack, using the Appel & Jacobson
+        algorithm over a prefix trie of the word list:
+          - anchors are the empty squares next to a tile (or the center square on
+            an empty board); every move covers at least one anchor;
+          - each empty square has a cross-check mask of the letters that form a
+            word with the tiles above and below it, plus the score of those tiles;
+          - for each anchor, left parts are built from the rack (or taken from the
+            tiles already to its left), then extended right through the trie,
+            placing only letters allowed by the cross-checks.
+        Down moves are generated the same way on the transposed board, which works
+        because the premium squares are symmetric about the diagonal.
+    """
+    trie: PrefixTrie = field(default_factory=PrefixTrie, repr=False)
+
+    def cross_checks(self, cells: list) -> tuple:
+        """ For each square, returns the mask of letters that may be played there in an across move
+            and the score of the tiles it would join vertically (None if it joins none).
+        """
+        checks = [[ALL_LETTERS_MASK] * SCRABBLE_SIZE for _ in range(SCRABBLE_SIZE)]
+        cross_scores = [[None] * SCRABBLE_SIZE for _ in range(SCRABBLE_SIZE)]
+        for r in range(SCRABBLE_SIZE):
+            for c in range(SCRABBLE_SIZE):
+                if cells[r][c]:
+                    continue
+                top = r
+                while top > 0 and cells[top-1][c]:
+                    top -= 1
+                bottom = r
+                while bottom < SCRABBLE_SIZE - 1 and cells[bottom+1][c]:
+                    bottom += 1
+                if top == r and bottom == r:
+                    continue
+                above = ''.join([cells[i][c] for i in range(top, r)])
+                below = ''.join([cells[i][c] for i in range(r + 1, bottom + 1)])
+                mask = 0
+                node = self.trie.node(above.upper())
+                if node is not None:
+                    for letter, bit in CHAR_BITMASK.items():
+                        child = node.get(letter)
+                        if child is not None:
+                            end = child
+                            for b in below.upper():
+                                end = end.get(b)
+                                if end is None:
+                                    break
+                            if end is not None and TRIE_WORD in end:
+                                mask |= bit
+                checks[r][c] = mask
+                cross_scores[r][c] = sum([scrabble_tile_value(t) for t in above + below])
+        return checks, cross_scores
+
+    def anchors(self, cells: list) -> list[tuple]:
+        anchors = list()
+        for r in range(SCRABBLE_SIZE):
+            for c in range(SCRABBLE_SIZE):
+                if not cells[r][c] and ((r > 0 and cells[r-1][c]) or (r < SCRABBLE_SIZE - 1 and cells[r+1][c]) or
+                                        (c > 0 and cells[r][c-1]) or (c < SCRABBLE_SIZE - 1 and cells[r][c+1])):
+                    anchors.append((r, c))
+        if len(anchors) == 0:
+            anchors.append((SCRABBLE_SIZE // 2, SCRABBLE_SIZE // 2))
+        return anchors
+
+    def score_move(self, cells: list, row: int, start: int, word: str, placed: list, cross_scores: list) -> int:
+        """ Scores an across move on cells: the main word plus every cross word formed by a placed tile. """
+        main = 0
+        word_mult = 1
+        crosses = 0
+        placed_cols = set([c for c, _ in placed])
+        for i, tile in enumerate(word):
+            c = start + i
+            value = scrabble_tile_value(tile)
+            if c in placed_cols:
+                letter_mult, square_word_mult = scrabble_multipliers(row, c)
+                main += value * letter_mult
+                word_mult *= square_word_mult
+                cross = cross_scores[row][c]
+                if cross is not None:
+                    crosses += (cross + value * letter_mult) * square_word_mult
+            else:
+                main += value
+        score = main * word_mult + crosses
+        if len(placed) == SCRABBLE_RACK_SIZE:
+            score += SCRABBLE_BINGO_BONUS
+        return score
+
+    def across_moves(self, cells: list, rack: dict, checks: list) -> list[tuple]:
+        """ Returns (row, start col, word, placed) for every across move on cells, where placed
+            is the list of (col, tile) placements and checks is the first half of cross_checks(cells).
+        """
+        anchors = self.anchors(cells)
+        anchor_set = set(anchors)
+        moves = list()
+
+        def extend_right(row: int, col: int, anchor_col: int, partial: str, node: dict, placed: list):
+            if col >= SCRABBLE_SIZE or not cells[row][col]:
+                if TRIE_WORD in node and col > anchor_col and len(placed) > 0:
+                    moves.append((row, col - len(partial), partial, list(placed)))
+                if col >= SCRABBLE_SIZE:
+                    return
+                allowed = checks[row][col]
+                for letter, child in node.items():
+                    if letter == TRIE_WORD or not allowed & CHAR_BITMASK[letter]:
+                        continue
+                    for tile in (letter, letter.lower()):
+                        source = letter if tile == letter else SCRABBLE_BLANK
+                        if rack.get(source, 0) > 0:
+                            rack[source] -= 1
+                            placed.append((col, tile))
+                            extend_right(row, col + 1, anchor_col, partial + tile, child, placed)
+                            placed.pop()
+                            rack[source] += 1
+            else:
+                tile = cells[row][col]
+                child = node.get(tile.upper())
+                if child is not None:
+                    extend_right(row, col + 1, anchor_col, partial + tile, child, placed)
+
+        def left_part(row: int, anchor_col: int, partial: str, node: dict, limit: int, placed: list):
+            extend_right(row, anchor_col, anchor_col, partial, node, placed)
+            if limit > 0:
+                for letter, child in node.items():
+                    if letter == TRIE_WORD:
+                        continue
+                    for tile in (letter, letter.lower()):
+                        source = letter if tile == letter else SCRABBLE_BLANK
+                        if rack.get(source, 0) > 0:
+                            rack[source] -= 1
+                            # Every tile of a left part comes from the rack, ending just before the anchor.
+                            left = partial + tile
+                            placed_left = [(anchor_col - len(left) + i, t) for i, t in enumerate(left)]
+                            left_part(row, anchor_col, left, child, limit - 1, placed_left)
+                            rack[source] += 1
+
+        for row, col in anchors:
+            if col > 0 and cells[row][col-1]:
+                # The tiles already to the left of the anchor are a fixed left part.
+                start = col
+                while start > 0 and cells[row][start-1]:
+                    start -= 1
+                prefix = ''.join(cells[row][start:col])
+                node = self.trie.node(prefix.upper())
+                if node is not None:
+                    extend_right(row, col, col, prefix, node, [])
+            else:
+                limit = 0
+                c = col - 1
+                while c >= 0 and not cells[row][c] and not (row, c) in anchor_set:
+                    limit += 1
+                    c -= 1
+                left_part(row, col, '', self.trie.root, limit, [])
+        return moves
+
+    def moves(self, board: ScrabbleBoard, rack_str: str) -> list[ScrabbleMove]:
+        """ Returns every legal move for the rack (use '?' for a blank), best score first. """
+        rack = dict()
+        for t in rack_str.upper():
+            if not (t == SCRABBLE_BLANK or 'A' <= t <= 'Z'):
+                raise ValueError(f"Rack tiles must be A-Z or {SCRABBLE_BLANK}: {rack_str}")
+            rack[t] = rack.get(t, 0) + 1
+        found = dict()
+        for across, cells in ((True, board.cells), (False, board.transposed().cells)):
+            checks, cross_scores = self.cross_checks(cells)
+            for row, start, word, placed in self.across_moves(cells, rack, checks):
+                score = self.score_move(cells, row, start, word, placed, cross_scores)
+                if across:
+                    tiles = tuple([(row, c, t) for c, t in placed])
+                    move = ScrabbleMove(row, start, True, word, score, tiles)
+                else:
+                    tiles = tuple([(c, row, t) for c, t in placed])
+                    move = ScrabbleMove(start, row, False, word, score, tiles)
+                key = tuple(sorted(tiles))
+                # A single tile can make the same play in both directions; keep the higher scoring.
+                if not key in found or found[key].score < score:
+                    found[key] = move
+        moves = list(found.values())
+        moves.sort(key=lambda m: (-m.score, m.row, m.col, not m.across, m.word))
+        return moves
+
+    def best_move(self, board: ScrabbleBoard, rack_str: str) -> ScrabbleMove:
+        moves = self.moves(board, rack_str)
+        return moves[0] if moves else None
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList) -> object:
+        return cls(PrefixTrie.from_wordlist(wl, 2, SCRABBLE_SIZE))
+
+HANGMAN_BLANK = '_'
+HANGMAN_EXPECTED = 'expected' # guess the letter revealing the most positions on average
+HANGMAN_MINIMAX = 'minimax'   # guess the letter leaving the fewest candidates in the worst case
+
+@dataclass
+class HangmanSolver:
+    """ Picks hangman guesses for a masked word like "_A__E".
+        Words are numbered separately for each length, and for each length the
+        solver keeps a bitset of word ids for each (position, letter) and for each
+        letter. The candidates for a mask are found by ANDing those bitsets, and a
+        letter is scored by popcounts of the candidates ANDed with its bitsets;
+        guessing a letter splits the candidates by the positions where it appears,
+        which is computed by refining the candidate bitset one position at a time.
+    """
+    words: dict = field(default_factory=dict)         # len -> list of words
+    all_words: dict = field(default_factory=dict)     # len -> bitset of every word
+    by_position: dict = field(default_factory=dict)   # (len, pos, letter) -> bitset
+    by_letter: dict = field(default_factory=dict)     # (len, letter) -> bitset
+
+    def __len__(self) -> int:
+        return sum([len(words) for words in self.words.values()])
+
+    def add_wordlist(self, wl: WordList):
+        pos_ids = dict()
+        letter_ids = dict()
+        for w in wl.word_list:
+            s = w.word
+            if not s.isalpha():
+                continue
+            n = len(s)
+            words = self.words.setdefault(n, [])
+            word_id = len(words)
+            words.append(s)
+            for i, c in enumerate(s):
+                pos_ids.setdefault((n, i, c), []).append(word_id)
+            for c in w.letter_set:
+                letter_ids.setdefault((n, c), []).append(word_id)
+        for n, words in self.words.items():
+            self.all_words[n] = (1 << len(words)) - 1
+        for table, ids_table in ((self.by_position, pos_ids), (self.by_letter, letter_ids)):
+            for k, ids in ids_table.items():
+                table[k] = table.get(k, 0) | ids_to_bits(ids)
+
+    def candidate_bits(self, mask: str, guessed: str = '') -> int:
+        """ Returns the bitset of words fitting the mask, given every letter guessed so far
+            (the letters showing in the mask count as guessed).
+        """
+        mask = mask.upper()
+        n = len(mask)
+        bits = self.all_words.get(n, 0)
+        guessed = set(guessed.upper()) | set([c for c in mask if c != HANGMAN_BLANK])
+        for i, c in enumerate(mask):
+            if c == HANGMAN_BLANK:
+                for g in guessed:
+                    bits &= ~self.by_position.get((n, i, g), 0)
+            else:
+                bits &= self.by_position.get((n, i, c), 0)
+            if bits == 0:
+                break
+        return bits
+
+    def candidates(self, mask: str, guessed: str = '') -> list[str]:
+        words = self.words.get(len(mask), [])
+        return [words[i] for i in bits_to_ids(self.candidate_bits(mask, guessed))]
+
+    def expected_positions(self, n: int, bits: int, letter: str) -> float:
+        total = bits.bit_count()
+        if total == 0:
+            return 0.0
+        hits = sum([(bits & self.by_position.get((n, i, letter), 0)).bit_count() for i in range(n)])
+        return hits / total
+
+    def partition(self, n: int, bits: int, letter: str) -> list[int]:
+        """ Splits the candidates into the groups that guessing the letter would tell apart,
+            i.e. by the set of positions the letter fills.
+        """
+        blocks = [bits]
+        for i in range(n):
+            pos_bits = self.by_position.get((n, i, letter), 0)
+            if pos_bits & bits == 0:
+                continue
+            refined = list()
+            for b in blocks:
+                inside = b & pos_bits
+                if inside:
+                    refined.append(inside)
+                outside = b & ~pos_bits
+                if outside:
+                    refined.append(outside)
+            blocks = refined
+        return blocks
+
+    def best_letter_for_bits(self, n: int, bits: int, guessed: set, strategy: str = HANGMAN_EXPECTED) -> str:
+        best = None
+        best_key = None
+        for letter in ALPHABET_LIST:
+            if letter in guessed or bits & self.by_letter.get((n, letter), 0) == 0:
+                continue
+            if strategy == HANGMAN_MINIMAX:
+                key = (max([b.bit_count() for b in self.partition(n, bits, letter)]), letter)
+            else:
+                key = (-self.expected_positions(n, bits, letter), letter)
+            if best_key is None or key < best_key:
+                best_key = key
+                best = letter
+        return best
+
+    def best_letter(self, mask: str, guessed: str = '', strategy: str = HANGMAN_EXPECTED) -> str:
+        """ Returns the best next guess, or None if no word fits the mask. """
+        bits = self.candidate_bits(mask, guessed)
+        guessed = set(guessed.upper()) | set([c for c in mask.upper() if c != HANGMAN_BLANK])
+        return self.best_letter_for_bits(len(mask), bits, guessed, strategy)
+
+    def simulate(self, word: str, strategy: str = HANGMAN_EXPECTED) -> tuple:
+        """ Plays one game against the word, returning (letters guessed in order, wrong guesses). """
+        word = word.upper()
+        n = len(word)
+        bits = self.candidate_bits(HANGMAN_BLANK * n)
+        guessed = set()
+        guesses = list()
+        wrong = 0
+        remaining = set(word)
+        while remaining:
+            letter = self.best_letter_for_bits(n, bits, guessed, strategy)
+            if letter is None:
+                raise ValueError(f'{word} is not in the word list')
+            guessed.add(letter)
+            guesses.append(letter)
+            if letter in remaining:
+                remaining.discard(letter)
+                for i, c in enumerate(word):
+                    pos_bits = self.by_position.get((n, i, letter), 0)
+                    bits = bits & pos_bits if c == letter else bits & ~pos_bits
+            else:
+                wrong += 1
+                bits &= ~self.by_letter.get((n, letter), 0)
+        return ''.join(guesses), wrong
+
+    def simulate_all(self, lengths: list[int] = None, strategy: str = HANGMAN_EXPECTED) -> dict:
+        """ Plays a game against every word (of the given lengths), returning a dict of word ->
+            (number of guesses, wrong guesses). Rather than playing each game separately, the
+            whole game tree is walked once: every group of candidates that a guess leaves
+            standing shares the rest of its game.
+        """
+        results = dict()
+        for n in sorted(self.words.keys() if lengths is None else lengths):
+            if not n in self.words:
+                continue
+            words = self.words[n]
+            stack = [(self.all_words[n], frozenset(), 0, 0)]
+            while stack:
+                bits, guessed, n_guesses, wrong = stack.pop()
+                if bits & (bits - 1) == 0:
+                    # One candidate left: each of its letters not yet guessed is one more right guess.
+                    s = words[bits.bit_length() - 1]
+                    results[s] = (n_guesses + len(set(s) - guessed), wrong)
+                    continue
+                letter = self.best_letter_for_bits(n, bits, guessed, strategy)
+                next_guessed = guessed | {letter}
+                letter_bits = self.by_letter.get((n, letter), 0)
+                for block in self.partition(n, bits, letter):
+                    stack.append((block, next_guessed, n_guesses + 1, wrong + (block & letter_bits == 0)))
+        return results
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList) -> object:
+        solver = cls()
+        solver.add_wordlist(wl)
+        return solver
+
+STATS_MAX_LEN = 64 # longer words are counted in the last length bucket, their letters past this are not counted by position
+STATS_PARALLEL_MIN = 100000 # don't bother with a process pool for fewer words than this
+STATS_CHUNK_SIZE = 25000
+
+def letter_index(c: str) -> int:
+    """ Returns 0-25 for A-Z, or -1 for anything else. """
+    i = ord(c) - 65
+    return i if 0 <= i < 26 else -1
+
+def zeros(n: int) -> array:
+    return array('Q', bytes(8 * n))
+
+@dataclass
+class CorpusStats:
+    """ Letter statistics for a whole word list, gathered in a single pass
+        (or in chunks across a process pool, then summed) into flat arrays:
+          length_hist[len]                      words of each length
+          letter_set_hist[n]                    words with n distinct letters
+          letter_pos_len[(len*MAX+pos)*26+L]    letter L at position pos in words of length len
+          letter_words[L], letter_repeat_words[L]   words containing L, and containing L more than once
+          bigram_occ[L1*26+L2], bigram_words    letter pair counts by occurrence and by word
+          trigram_occ[(L1*26+L2)*26+L3], trigram_words
+        Non-letters are skipped. Exemplars are the alphabetically first word of each
+        length and the alphabetically last word of each letter set size.
+        The report functions (word_length_histogram, print_letter_pair_counts, etc.)
+        are views over these arrays.
+    """
+    n_words: int = 0
+    length_hist: array = field(default_factory=lambda: zeros(STATS_MAX_LEN + 1), repr=False)
+    letter_set_hist: array = field(default_factory=lambda: zeros(27), repr=False)
+    letter_pos_len: array = field(default_factory=lambda: zeros((STATS_MAX_LEN + 1) * STATS_MAX_LEN * 26), repr=False)
+    letter_words: array = field(default_factory=lambda: zeros(26), repr=False)
+    letter_repeat_words: array = field(default_factory=lambda: zeros(26), repr=False)
+    bigram_occ: array = field(default_factory=lambda: zeros(26 * 26), repr=False)
+    bigram_words: array = field(default_factory=lambda: zeros(26 * 26), repr=False)
+    trigram_occ: array = field(default_factory=lambda: zeros(26 * 26 * 26), repr=False)
+    trigram_words: array = field(default_factory=lambda: zeros(26 * 26 * 26), repr=False)
+    length_exemplar: dict = field(default_factory=dict, repr=False)
+    letter_set_exemplar: dict = field(default_factory=dict, repr=False)
+    CACHE_VERSION = 1
+
+    def add_strs(self, strs: list[str]):
+        lpl = self.letter_pos_len
+        bigram_occ = self.bigram_occ
+        trigram_occ = self.trigram_occ
+        for s in strs:
+            s = s.upper()
+            n = min(len(s), STATS_MAX_LEN)
+            self.n_words += 1
+            self.length_hist[n] += 1
+            if not n in self.length_exemplar or s < self.length_exemplar[n]:
+                self.length_exemplar[n] = s
+            idx = [letter_index(c) for c in s]
+            letters = set([i for i in idx if i >= 0])
+            self.letter_set_hist[len(letters)] += 1
+            if s > self.letter_set_exemplar.get(len(letters), ''):
+                self.letter_set_exemplar[len(letters)] = s
+            for i in letters:
+                self.letter_words[i] += 1
+                if idx.count(i) > 1:
+                    self.letter_repeat_words[i] += 1
+            base = n * STATS_MAX_LEN * 26
+            for pos, i in enumerate(idx[:STATS_MAX_LEN]):
+                if i >= 0:
+                    lpl[base + pos * 26 + i] += 1
+            bigrams = set()
+            for a, b in zip(idx, idx[1:]):
+                if a >= 0 and b >= 0:
+                    bi = a * 26 + b
+                    bigram_occ[bi] += 1
+                    bigrams.add(bi)
+            for bi in bigrams:
+                self.bigram_words[bi] += 1
+            trigrams = set()
+            for a, b, c in zip(idx, idx[1:], idx[2:]):
+                if a >= 0 and b >= 0 and c >= 0:
+                    ti = (a * 26 + b) * 26 + c
+                    trigram_occ[ti] += 1
+                    trigrams.add(ti)
+            for ti in trigrams:
+                self.trigram_words[ti] += 1
+
+    def merge(self, other: object):
+        self.n_words += other.n_words
+        for name in ('length_hist', 'letter_set_hist', 'letter_pos_len', 'letter_words', 'letter_repeat_words',
+                     'bigram_occ', 'bigram_words', 'trigram_occ', 'trigram_words'):
+            a = getattr(self, name)
+            b = getattr(other, name)
+            setattr(self, name, array('Q', map(operator.add, a, b)))
+        for n, s in other.length_exemplar.items():
+            if not n in self.length_exemplar or s < self.length_exemplar[n]:
+                self.length_exemplar[n] = s
+        for n, s in other.letter_set_exemplar.items():
+            if s > self.letter_set_exemplar.get(n, ''):
+                self.letter_set_exemplar[n] = s
+
+    def max_length(self) -> int:
+        return max([n for n, count in enumerate(self.length_hist) if count > 0], default=0)
+
+    def max_letter_set_length(self) -> int:
+        return max([n for n, count in enumerate(self.letter_set_hist) if count > 0], default=0)
+
+    def letter_position_counts(self, letter: str, length: int) -> list[int]:
+        """ Returns the count of the letter in each position of words of the given length. """
+        base = length * STATS_MAX_LEN * 26 + letter_index(letter)
+        return [self.letter_pos_len[base + pos * 26] for pos in range(min(length, STATS_MAX_LEN))]
+
+    def bigram_count(self, pair: str, by_word: bool = True) -> int:
+        counts = self.bigram_words if by_word else self.bigram_occ
+        return counts[letter_index(pair[0]) * 26 + letter_index(pair[1])]
+
+    def trigram_count(self, tri: str, by_word: bool = True) -> int:
+        counts = self.trigram_words if by_word else self.trigram_occ
+        return counts[(letter_index(tri[0]) * 26 + letter_index(tri[1])) * 26 + letter_index(tri[2])]
+
+    def bigram_table(self, by_word: bool = True) -> dict:
+        """ Returns a dict with each letter A-Z as key and a list of 26 pair counts as value,
+            i.e. table[first letter][second letter index].
+        """
+        counts = self.bigram_words if by_word else self.bigram_occ
+        return {c: counts[i*26:(i+1)*26].tolist() for i, c in enumerate(ALPHABET_LIST)}
+
+    def bigram_dict(self, by_word: bool = True) -> dict:
+        """ Same content as WordList.digraphs_by_word() (or digraphs_by_occurrence() if not by_word). """
+        counts = self.bigram_words if by_word else self.bigram_occ
+        return {ALPHABET_LIST[i // 26] + ALPHABET_LIST[i % 26]: count for i, count in enumerate(counts) if count > 0}
+
+    @classmethod
+    def from_strs(cls, strs: list[str], processes: int = None) -> object:
+        """ Builds the stats for the given strings. For large inputs (or if processes is given)
+            the strings are split into chunks that are counted across a process pool and merged.
+        """
+        if processes is None:
+            processes = os.cpu_count() if len(strs) >= STATS_PARALLEL_MIN else 1
+        stats = cls()
+        if processes <= 1:
+            stats.add_strs(strs)
+            return stats # PUNCH-OUT
+        chunks = [strs[i:i+STATS_CHUNK_SIZE] for i in range(0, len(strs), STATS_CHUNK_SIZE)]
+        with multiprocessing.Pool(processes) as pool:
+            for chunk_stats in pool.imap(corpus_stats_chunk, chunks):
+                stats.merge(chunk_stats)
+        return stats
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList, processes: int = None) -> object:
+        return cls.from_strs([w.word for w in wl.word_list], processes)
+
+    @classmethod
+    def for_wordlist(cls, wl: WordList, processes: int = None) -> object:
+        """ Same as from_wordlist, cached on disk (see IndexCache). """
+        return cached_index(cls.__name__, cls.CACHE_VERSION, [wl], lambda: cls.from_wordlist(wl, processes))
+
+def corpus_stats_chunk(strs: list[str]) -> CorpusStats:
+    stats = CorpusStats()
+    stats.add_strs(strs)
+    return stats
+
+@dataclass
+class DigraphScorer:
+    """ Scores every word of a word list as the sum of the weights of the
+        distinct letter pairs (digraphs) it contains. Each word is mapped to
+        its bigram indices (first*26 + second) once, so scoring the whole list
+        under a weight table of 676 entries (e.g. CorpusStats.bigram_words) is
+        just a gather-and-sum, and many weight tables can be tried cheaply.
+    """
+    words: list = field(default_factory=list)
+    word_bigrams: list = field(default_factory=list, repr=False) # parallel to words: tuple of bigram indices
+    CACHE_VERSION = 1
+
+    def add_wordlist(self, wl: WordList):
+        for w in wl.word_list:
+            idx = [letter_index(c) for c in w.word]
+            bigrams = set()
+            for a, b in zip(idx, idx[1:]):
+                if a >= 0 and b >= 0:
+                    bigrams.add(a * 26 + b)
+            self.words.append(w)
+            self.word_bigrams.append(tuple(sorted(bigrams)))
+
+    @staticmethod
+    def weights_from_dict(d: dict) -> list:
+        """ Converts a dict of digraph -> weight (e.g. from WordList.digraphs_by_word()) to a weight table. """
+        weights = [0] * (26 * 26)
+        for digraph, weight in d.items():
+            a = letter_index(digraph[0])
+            b = letter_index(digraph[1])
+            if a >= 0 and b >= 0:
+                weights[a * 26 + b] = weight
+        return weights
+
+    def scores(self, weights) -> list:
+        """ Returns the list of scores, parallel to self.words. """
+        get = weights.__getitem__
+        return [sum(map(get, bigrams)) for bigrams in self.word_bigrams]
+
+    def top_k(self, weights, k: int) -> list[tuple]:
+        """ Returns the k best (score, Word) tuples, highest score first, ties broken alphabetically. """
+        return [(score, w) for score, w in heapq.nsmallest(k, zip(self.scores(weights), self.words),
+                                                           key=lambda t: (-t[0], t[1]))]
+
+    def above(self, weights, threshold) -> list[tuple]:
+        """ Returns all (score, Word) tuples with a score of at least threshold, highest score first. """
+        selected = [(score, w) for score, w in zip(self.scores(weights), self.words) if score >= threshold]
+        selected.sort(key=lambda t: (-t[0], t[1]))
+        return selected
+
+    def rescore_many(self, tables: dict, k: int) -> dict:
+        """ Returns a dict with the same keys as tables (name -> weight table) and the top k for each as values. """
+        return {name: self.top_k(weights, k) for name, weights in tables.items()}
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList) -> object:
+        scorer = cls()
+        scorer.add_wordlist(wl)
+        return scorer
+
+    @classmethod
+    def for_wordlist(cls, wl: WordList) -> object:
+        """ Same as from_wordlist, cached on disk (see IndexCache). """
+        return cached_index(cls.__name__, cls.CACHE_VERSION, [wl], lambda: cls.from_wordlist(wl))
+
+def words_by_length(wl: WordList) -> dict:
+    """ Returns a dict with word length as key and the list of Words of that length as value.
+        (WordList.words_of_length keeps one of these for the list.)
+    """
+    by_len = dict()
+    for w in wl.word_list:
+        l = by_len.get(len(w.word))
+        if l is None:
+            l = list()
+            by_len[len(w.word)] = l
+        l.append(w)
+    return by_len
+
+def find_resplits(word_lengths: tuple, piece_lengths: tuple, source, target) -> list[tuple]:
+    """ Finds concatenations of words from source, with the given word lengths in
+        order, that re-split into pieces of the given lengths which are all words
+        in target. E.g. word_lengths (2, 8) and piece_lengths (5, 5) finds 2+8
+        letter word pairs whose 10 letters are two 5-letter target words, and
+        word_lengths (15,) with piece_lengths (5, 5, 5) splits single words.
+        source and target are WordLists, or lists of WordLists with one per word
+        (source) or one per piece (target).
+        Returns a sorted list of (tuple of source Words, tuple of piece strings).
+
+        Rather than trying every combination of words, the concatenation is built
+        one word at a time as a hash join: the piece straddling each word boundary
+        is split at that boundary for every target word of its length, and only
+        the left sides ending with the first half and the right words starting
+        with the second half are paired up.
+    """
+    if sum(word_lengths) != sum(piece_lengths):
+        raise ValueError(f'Word lengths {word_lengths} and piece lengths {piece_lengths} have different totals.')
+    sources = source if isinstance(source, list) else [source] * len(word_lengths)
+    targets = target if isinstance(target, list) else [target] * len(piece_lengths)
+    pieces = list()
+    start = 0
+    for n in piece_lengths:
+        pieces.append((start, start + n))
+        start += n
+
+    def pieces_ok(s: str, begin: int, end: int, skip: int = -1) -> bool:
+        # Are all the pieces lying wholly within [begin, end) target words? s starts at begin.
+        for p, (ps, pe) in enumerate(pieces):
+            if p != skip and begin <= ps and pe <= end and not s[ps-begin:pe-begin] in targets[p].word_dict:
+                return False
+        return True
+
+    offset = word_lengths[0]
+    lefts = sources[0].stream().where_len(offset).where(lambda w: pieces_ok(w.word, 0, offset)).map(lambda w: (w.word, (w,))).to_list()
+    for k, n in enumerate(word_lengths[1:], 1):
+        straddle = [p for p, (ps, pe) in enumerate(pieces) if ps < offset < pe]
+        skip = straddle[0] if straddle else -1
+        rights = sources[k].stream().where_len(n).where(lambda w: pieces_ok(w.word, offset, offset + n, skip)).to_list()
+        joined = list()
+        if not straddle:
+            for s, ws in lefts:
+                for w in rights:
+                    joined.append((s + w.word, ws + (w,)))
+        else:
+            ps, pe = pieces[skip]
+            left_len = offset - ps
+            right_len = min(pe, offset + n) - offset
+            lefts_by_suffix = dict()
+            for s, ws in lefts:
+                lefts_by_suffix.setdefault(s[-left_len:], []).append((s, ws))
+            rights_by_prefix = dict()
+            for w in rights:
+                rights_by_prefix.setdefault(w.word[:right_len], []).append(w)
+            keys = set()
+            for t in targets[skip].words_of_length(pe - ps):
+                if t.word[:left_len] in lefts_by_suffix and t.word[left_len:left_len+right_len] in rights_by_prefix:
+                    keys.add((t.word[:left_len], t.word[left_len:left_len+right_len]))
+            for left_key, right_key in keys:
+                for s, ws in lefts_by_suffix[left_key]:
+                    for w in rights_by_prefix[right_key]:
+                        joined.append((s + w.word, ws + (w,)))
+        lefts = joined
+        offset += n
+    results = [(ws, tuple([s[ps:pe] for ps, pe in pieces])) for s, ws in lefts]
+    results.sort()
+    return results
+
+WORDNIK_WORDLIST_PATH = './wordnik-wordlist'
+WORDNIK_ADDITIONS_PATH = './wordnik-additions'
+WORDNIK_BEEWORDS_PATH = './wordnik-beewords'
+
+BEE_MIN_WORD_LEN = 4
+BEE_N_LETTERS = 7
+BEE_PANGRAM_BONUS = 7
+
+def bee_word_score(w: Word) -> int:
+    """ Spelling Bee scoring: a 4-letter word is worth 1 point, longer words
+        are worth one point per letter, and a pangram (a word using all seven
+        letters) earns a bonus of 7 points.
+    """
+    n = len(w.word)
+    score = 1 if n == BEE_MIN_WORD_LEN else n
+    if len(w.letter_set) == BEE_N_LETTERS:
+        score += BEE_PANGRAM_BONUS
+    return score
+
+def submasks(mask: int):
+    """ Generates every non-empty submask of the given bitmask (including the mask itself).
+    """
+    sub = mask
+    while sub:
+        yield sub
+        sub = (sub - 1) & mask
+
+@dataclass
+class BeePuzzle:
+    letters: str
+    center: str
+    words: list = field(default_factory=list)
+    pangrams: list = field(default_factory=list)
+    score: int = 0
+
+@dataclass
+class BeeSolver:
+    """ Spelling Bee engine. Eligible words (at least 4 letters, at most 7
+        distinct letters) are grouped by letter_set_mask, so the words for a
+        puzzle are found by looking up the 64 submasks of the puzzle's letters
+        that include the center letter, rather than by scanning the word list.
+    """
+    groups: dict = field(default_factory=dict)      # letter_set_mask -> list of Words
+    group_score: dict = field(default_factory=dict) # letter_set_mask -> total score of the group
+    CACHE_VERSION = 1
+
+    def add_wordlist(self, wl: WordList):
+        for w in wl.word_list:
+            if len(w.word) >= BEE_MIN_WORD_LEN and len(w.letter_set) <= BEE_N_LETTERS and w.word.isalpha():
+                group = self.groups.get(w.letter_set_mask)
+                if group is None:
+                    group = list()
+                    self.groups[w.letter_set_mask] = group
+                group.append(w)
+                self.group_score[w.letter_set_mask] = self.group_score.get(w.letter_set_mask, 0) + bee_word_score(w)
+
+    def solve(self, letters: str, center: str) -> BeePuzzle:
+        """ Returns the BeePuzzle for the given 7 letters and center letter.
+            The center letter may or may not be repeated in letters.
+        """
+        letters_word = Word(letters + center)
+        center = center.upper()
+        center_bit = CHAR_BITMASK[center]
+        puzzle = BeePuzzle(letters_word.sorted_letters(), center)
+        for sub in submasks(letters_word.letter_set_mask):
+            if sub & center_bit:
+                group = self.groups.get(sub)
+                if group is not None:
+                    puzzle.words.extend(group)
+                    puzzle.score += self.group_score[sub]
+                    if sub == letters_word.letter_set_mask and len(letters_word.letter_set) == BEE_N_LETTERS:
+                        puzzle.pangrams.extend(group)
+        puzzle.words.sort()
+        puzzle.pangrams.sort()
+        return puzzle
+
+    def pangram_masks(self) -> list[int]:
+        return [mask for mask in self.groups if mask.bit_count() == BEE_N_LETTERS]
+
+    def all_puzzle_scores(self) -> list[tuple]:
+        """ Enumerates the whole puzzle space: every 7-letter pangram mask in the
+            word list, scored for each of its 7 possible center letters.
+            Returns a list of (letters, center, n_words, score) tuples.
+
+            Rather than solving each of the 7 puzzles for a mask separately, the
+            submask totals for the mask are gathered once, and each center's
+            total is the sum over the submasks containing that center's bit.
+        """
+        scores = list()
+        for mask in self.pangram_masks():
+            letters = ''.join([c for c in ALPHABET_LIST if CHAR_BITMASK[c] & mask])
+            center_words = dict.fromkeys(letters, 0)
+            center_score = dict.fromkeys(letters, 0)
+            for sub in submasks(mask):
+                group = self.groups.get(sub)
+                if group is not None:
+                    n = len(group)
+                    s = self.group_score[sub]
+                    for c in letters:
+                        if sub & CHAR_BITMASK[c]:
+                            center_words[c] += n
+                            center_score[c] += s
+            for c in letters:
+                scores.append((letters, c, center_words[c], center_score[c]))
+        return scores
+
+    @classmethod
+    def from_wordlist(cls, wl: WordList) -> object:
+        bee = cls()
+        bee.add_wordlist(wl)
+        return bee
 
     @classmethod
-    def from_word_set(cls, w_set: set) -> object:
-        wl = cls()
-        for w in w_set:
-            wl.add_word(w)
+    def for_wordlist(cls, wl: WordList) -> object:
+        """ Same as from_wordlist, cached on disk (see IndexCache). """
+        return cached_index(cls.__name__, cls.CACHE_VERSION, [wl], lambda: cls.from_wordlist(wl))
+
+WORDLE_ALL_PATH = 'wordle/ALL'
+WORDLE_ANSWERS_PATH = 'wordle/ANSWERS'
+WORDLE_GUESSES_PATH = 'wordle/NON-ANSWERS'
+WORDLE_PU_PATH = 'wordle/PU'
+
+CORPUS_PATHS = {
+    'wordle-answers': WORDLE_ANSWERS_PATH,
+    'wordle-guesses': WORDLE_GUESSES_PATH,
+    'wordle-pu': WORDLE_PU_PATH,
+    'wordnik': WORDNIK_WORDLIST_PATH,
+    'wordnik-additions': WORDNIK_ADDITIONS_PATH,
+    'wordnik-bee': WORDNIK_BEEWORDS_PATH,
+}
+
+CORPUS_UNIONS = {
+    'wordle-all': ('wordle-guesses', 'wordle-answers'),
+}
+
+CORPUS_NAMES = {path: name for name, path in CORPUS_PATHS.items()}
+
+FREQ_SUFFIX = '.freq' # a word list's frequency column lives next to it, e.g. ./wordnik-beewords.freq
+
+def file_stamp(path: str) -> tuple:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+def frequencies_path(path: str) -> str:
+    return path + FREQ_SUFFIX
+
+def save_frequencies(counts: dict, path: str):
+    """ Writes counts (word string -> count) as WORD<tab>COUNT lines, most frequent first.
+        The file is written beside its final name and then renamed over it, so a reader
+        never sees half of it.
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            for s, n in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+                f.write(f'{s}\t{n}\n')
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def load_frequencies(path: str) -> dict:
+    """ Reads a file written by save_frequencies back into a dict of word string -> count. """
+    counts = dict()
+    with open(path, 'r') as f:
+        for line in f:
+            s, _, n = line.rstrip('\n').partition('\t')
+            if s:
+                counts[s.upper()] = int(n)
+    return counts
+
+@dataclass
+class CorpusRegistry:
+    """ Loads each word list once per process and hands out the same WordList on
+        every later request, until its file changes (by mtime or size).
+        Names in CORPUS_PATHS map to files, names in CORPUS_UNIONS are built
+        from other corpora (sharing their Word objects), and any other name is
+        taken to be a file path. A union, or a sorted view, is rebuilt when any
+        of the corpora it is made from has changed.
+        A file with a frequencies file beside it (see FREQ_SUFFIX) gets that
+        frequency column attached, and is rebuilt when either file changes.
+        The WordLists returned are shared: callers must not add to, remove from
+        or reorder them; build a new WordList (e.g. from_word_set) to modify.
+    """
+    entries: dict = field(default_factory=dict, repr=False) # (name, sorted) -> (stamp, WordList)
+
+    def stamp(self, name: str) -> tuple:
+        parts = CORPUS_UNIONS.get(name)
+        if parts is not None:
+            return tuple([self.stamp(part) for part in parts])
+        path = CORPUS_PATHS.get(name, name)
+        freq_path = frequencies_path(path)
+        return file_stamp(path), file_stamp(freq_path) if os.path.exists(freq_path) else None
+
+    def build(self, name: str) -> WordList:
+        parts = CORPUS_UNIONS.get(name)
+        if parts is None:
+            path = CORPUS_PATHS.get(name, name)
+            wl = WordList.from_file(path)
+            if os.path.exists(frequencies_path(path)):
+                wl.set_frequencies(load_frequencies(frequencies_path(path)))
+            return wl
+        wl = WordList()
+        for part in parts:
+            part_wl = self.get(part)
+            wl.add_wordlist(part_wl)
+            wl.freqs.update(part_wl.freqs)
         return wl
-    
-    @classmethod
-    def from_file(cls, path: str) -> object:
-        wl = cls()
-        with open(path, 'r') as f:
-            for line in f:
-                wl.add_str_list(line.split())
+
+    def files(self, name: str) -> list[str]:
+        """ Returns the word list files a corpus is read from. """
+        name = CORPUS_NAMES.get(name, name)
+        parts = CORPUS_UNIONS.get(name)
+        if parts is None:
+            return [CORPUS_PATHS.get(name, name)]
+        return [path for part in parts for path in self.files(part)]
+
+    def get(self, name: str, sort: bool = False) -> WordList:
+        name = CORPUS_NAMES.get(name, name) # a named corpus' path shares its entry
+        key = (name, sort)
+        stamp = self.stamp(name)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        if sort:
+            # A sorted view reuses the unsorted list's Words.
+            wl = WordList.sorted_view(self.get(name))
+        else:
+            wl = self.build(name)
+        self.entries[key] = (stamp, wl)
         return wl
 
+    def clear(self):
+        self.entries.clear()
+
+CORPORA = CorpusRegistry()
+
+def get_corpus(name_or_path: str, sort: bool = False) -> WordList:
+    """ Returns the shared, cached WordList for a named corpus (see CORPUS_PATHS and
+        CORPUS_UNIONS) or a word list file path; with sort=True, a sorted view of it.
+        Every caller gets the same WordList, so it must not be modified: copy it
+        (e.g. WordList.from_word_set) before adding, removing or sorting.
+    """
+    return CORPORA.get(name_or_path, sort)
+
+FREQ_CHUNK_BYTES = 1 << 24          # text is counted in chunks of about this many bytes...
+FREQ_CHUNKS_IN_FLIGHT = 2           # ...with at most this many per process read ahead or being counted
+# Maps ASCII letters to uppercase and every other ASCII byte to a space, so that after one
+# translate() a plain split() yields the words; bytes of non-ASCII letters are kept, so
+# those words never match. This is several times faster than a regex over the chunk.
+FREQ_TOKEN_TABLE = bytes(c if c >= 0x80 else ord(chr(c).upper()) if chr(c).isalpha() else 0x20 for c in range(256))
+def count_chunk_words(chunk: bytes, targets: set) -> dict:
+    """ Counts the words of chunk, uppercased, that are in targets (a set of uppercase ASCII bytes). """
+    # Counting every word and then dropping the others beats testing each word on the way in.
+    counts = collections.Counter(chunk.translate(FREQ_TOKEN_TABLE).split())
+    return {s.decode('ascii'): n for s, n in counts.items() if s in targets}
+
+# The target words handed to each pool process once, by freq_worker_init.
+freq_worker_targets = None
+
+def freq_worker_init(targets: set):
+    global freq_worker_targets
+    freq_worker_targets = targets
+
+def freq_count_chunk(chunk: bytes) -> dict:
+    return count_chunk_words(chunk, freq_worker_targets)
+
+def count_word_frequencies(paths: list[str], wl: WordList, processes: int = None,
+                           chunk_bytes: int = FREQ_CHUNK_BYTES) -> collections.Counter:
+    """ Counts how often each of wl's words occurs in the text files at paths (plain or
+        gzipped), case-insensitively. The files are read in chunks that are counted across
+        a process pool; only a few chunks are ever in memory, however big the files are.
+    """
+    targets = {w.word.encode('ascii') for w in wl.word_list if w.word.isascii()}
+    chunks = (chunk for path in paths for chunk in read_text_chunks(path, chunk_bytes))
+    totals = collections.Counter()
+    if processes is None:
+        processes = os.cpu_count()
+    if processes <= 1:
+        for chunk in chunks:
+            totals.update(count_chunk_words(chunk, targets))
+        return totals
+    # Pool.imap would read the whole input ahead of the workers, so keep a bounded
+    # window of chunks in flight and merge each one's counts as it comes back.
+    pending = collections.deque()
+    with multiprocessing.Pool(processes, freq_worker_init, (targets,)) as pool:
+        for chunk in chunks:
+            if len(pending) >= processes * FREQ_CHUNKS_IN_FLIGHT:
+                totals.update(pending.popleft().get())
+            pending.append(pool.apply_async(freq_count_chunk, (chunk,)))
+        while pending:
+            totals.update(pending.popleft().get())
+    return totals
+
+def compile_frequencies(name_or_path: str, text_paths: list[str], processes: int = None) -> WordList:
+    """ Counts a corpus' words across the given text dumps and saves the counts beside
+        each of the corpus' word list files, so get_corpus attaches them from now on.
+        Returns the corpus with its new frequency column.
+    """
+    counts = count_word_frequencies(text_paths, get_corpus(name_or_path), processes)
+    for path in CORPORA.files(name_or_path):
+        part = get_corpus(path)
+        save_frequencies({s: counts[s] for s in part.word_dict if counts[s] > 0}, frequencies_path(path))
+    return get_corpus(name_or_path)
+
+QUERY_LENGTH = 'length'         # arg: (min length, max length)
+QUERY_CONTAINS = 'contains'     # arg: letters that must all appear
+QUERY_EXCLUDES = 'excludes'     # arg: letters that must not appear
+QUERY_SUBSET = 'subset of'      # arg: letters that are the only ones allowed
+QUERY_LETTERSET = 'distinct letters' # arg: size of the letter set
+QUERY_PATTERN = 'pattern'       # arg: a PatternIndex pattern, e.g. A?P?E or *GN*
+QUERY_SUBSTRING = 'substring'   # arg: a run of letters that must appear
+QUERY_IN = 'in'                 # arg: corpus name or path
+QUERY_NOT_IN = 'not in'         # arg: corpus name or path
+
+QUERY_CORPUS_ALIASES = {
+    'answers': 'wordle-answers',
+    'guesses': 'wordle-guesses',
+    'wordleable': 'wordle-all',
+    'pu': 'wordle-pu',
+}
+
+PLAN_BITSET = 'bitset'     # AND of per-length / per-letter / per-position word id bitsets
+PLAN_POSTINGS = 'postings' # n-gram postings lists
+PLAN_JOIN = 'join'         # hash join against another corpus
+PLAN_SCAN = 'scan'         # per-word test of the remaining candidates (mask or set probe)
+
+PLAN_INDEX_MAX_FRACTION = 0.5 # a clause passing more words than this is left to the scan...
+PLAN_SCAN_BELOW = 256         # ...as is every clause once fewer candidates than this are expected
+
+@dataclass
+class QueryClause:
+    kind: str
+    arg: object
+
+    def __repr__(self) -> str:
+        if self.kind == QUERY_LENGTH:
+            lo, hi = self.arg
+            return f'length {lo}' if lo == hi else f'length {lo}-{hi}'
+        return f'{self.kind} {self.arg}'
+
+@dataclass
+class WordQuery:
+    """ A declarative question about a corpus, as a list of clauses that must all
+        hold, e.g. WordQuery.parse("length 5, contains {J,A,N}, subset of JANUARY, not in answers").
+        Clauses, separated by commas:
+            length N | length N-M
+            contains {LETTERS} | contains LETTERS   (all of the letters, anywhere)
+            contains "RUN" | contains substring RUN (the letters in a run)
+            excludes LETTERS
+            subset of LETTERS                       (no other letters)
+            distinct letters N
+            pattern A?P?E                           (see PatternIndex)
+            in CORPUS | not in CORPUS               (a corpus name, alias or path)
+    """
+    clauses: list = field(default_factory=list)
+
+    def __repr__(self) -> str:
+        return ', '.join([repr(c) for c in self.clauses])
+
+    def where(self, kind: str, arg) -> object:
+        return WordQuery(self.clauses + [QueryClause(kind, arg)])
+
+    @staticmethod
+    def letters_arg(text: str) -> str:
+        letters = re.sub(r'[^A-Z]', '', text.upper())
+        if not letters:
+            raise ValueError(f'No letters given in query clause: {text}')
+        return ''.join(sorted(set(letters)))
+
     @classmethod
-    def random_from_wordlist(cls, wl: object, N: int) -> object:
-        """ N is the desired number of words to retain out of
-            the given WordList wl.
-            If N > len(words) then the given WordList is returned,
-            otherwise a new WordList is returned of size N.
-        """
-        if N > len(wl):
-            return wl # PUNCH-OUT
-        # Don't try to be tricky, just pick a random word
-        # from the file list and add it to the random list
-        # until the size of the random list meets the target N.
-        rl = cls()
-        while len(rl) < N:
-            r = random.randrange(0, len(wl))
-            rl.add_word(wl.word_list[r])
-        return rl
-    
-    @classmethod
-    def random_from_file(cls, path: str, N: int) -> object:
-        """ N is the desired number of words to retain out of
-            whatever is loaded from the given path.
-            If N > len(words) then all the words are kept.
+    def parse(cls, text: str) -> object:
+        query = cls()
+        for part in re.split(r',(?![^{]*})', text): # commas inside {...} don't separate clauses
+            clause = part.strip()
+            if not clause:
+                continue
+            lowered = clause.lower()
+            m = re.fullmatch(r'length\s+(\d+)(?:\s*-\s*(\d+))?', lowered)
+            if m:
+                lo = int(m.group(1))
+                hi = int(m.group(2)) if m.group(2) else lo
+                query = query.where(QUERY_LENGTH, (lo, hi))
+                continue
+            m = re.fullmatch(r'contains\s+(?:substring\s+([a-z]+)|["\']([a-z]+)["\'])', lowered)
+            if m:
+                query = query.where(QUERY_SUBSTRING, (m.group(1) or m.group(2)).upper())
+                continue
+            m = re.fullmatch(r'(contains|excludes|subset of)\s+(?:letters\s+)?(.+)', lowered)
+            if m:
+                kind = {'contains': QUERY_CONTAINS, 'excludes': QUERY_EXCLUDES, 'subset of': QUERY_SUBSET}[m.group(1)]
+                query = query.where(kind, cls.letters_arg(m.group(2)))
+                continue
+            m = re.fullmatch(r'distinct letters\s+(\d+)', lowered)
+            if m:
+                query = query.where(QUERY_LETTERSET, int(m.group(1)))
+                continue
+            m = re.fullmatch(r'(?:pattern|matches)\s+(\S+)', clause, re.IGNORECASE)
+            if m:
+                query = query.where(QUERY_PATTERN, m.group(1).upper())
+                continue
+            m = re.fullmatch(r'(not in|in)\s+(\S+)', clause, re.IGNORECASE)
+            if m:
+                name = m.group(2)
+                name = QUERY_CORPUS_ALIASES.get(name.lower(), name.lower() if name.lower() in CORPUS_PATHS or name.lower() in CORPUS_UNIONS else name)
+                query = query.where(QUERY_NOT_IN if m.group(1).lower() == 'not in' else QUERY_IN, name)
+                continue
+            raise ValueError(f'Unrecognized query clause: {clause}')
+        return query
+
+@dataclass
+class QueryStep:
+    clause: QueryClause
+    method: str
+    estimate: float # estimated fraction of the corpus passing the clause
+
+@dataclass
+class QueryPlanner:
+    """ Answers WordQuery questions over one corpus.
+        Each clause's selectivity is estimated from the corpus' CorpusStats
+        (length histogram, per-letter word counts, letter x position x length
+        counts, bigram and trigram word counts), assuming independence. The
+        clauses an index can answer are applied most selective first, each as a
+        word id bitset: lengths, letters and patterns from a PatternIndex,
+        substrings from NgramIndex postings, and in / not in as a hash join with
+        the other corpus. Once few candidates are expected, or for clauses no
+        index helps with (subset of, distinct letters) or that pass most words,
+        the surviving candidates are just scanned, cheapest test first.
+        The indexes are loaded (see IndexCache) or built the first time a plan needs them.
+    """
+    corpus: WordList = field(repr=False)
+    n_words: int = 0
+    stats: CorpusStats = field(default=None, repr=False)
+    patterns: PatternIndex = field(default=None, repr=False)
+    ngrams: NgramIndex = field(default=None, repr=False)
+    word_ids: dict = field(default=None, repr=False) # word string -> id
+
+    def __post_init__(self):
+        self.n_words = len(self.corpus.word_list)
+        if self.stats is None:
+            self.stats = CorpusStats.for_wordlist(self.corpus)
+
+    def pattern_index(self) -> PatternIndex:
+        if self.patterns is None:
+            self.patterns = PatternIndex.for_wordlist(self.corpus)
+        return self.patterns
+
+    def ngram_index(self) -> NgramIndex:
+        if self.ngrams is None:
+            self.ngrams = NgramIndex.for_wordlist(self.corpus)
+        return self.ngrams
+
+    def letter_fraction(self, c: str) -> float:
+        return self.stats.letter_words[letter_index(c)] / self.n_words if self.n_words else 0.0
+
+    def estimate(self, clause: QueryClause) -> float:
+        if self.n_words == 0:
+            return 0.0
+        kind = clause.kind
+        N = self.n_words
+        if kind == QUERY_LENGTH:
+            lo, hi = clause.arg
+            return sum([self.stats.length_hist[n] for n in range(lo, min(hi, STATS_MAX_LEN) + 1)]) / N
+        elif kind == QUERY_CONTAINS:
+            return math.prod([self.letter_fraction(c) for c in clause.arg])
+        elif kind == QUERY_EXCLUDES:
+            return math.prod([1 - self.letter_fraction(c) for c in clause.arg])
+        elif kind == QUERY_SUBSET:
+            return math.prod([1 - self.letter_fraction(c) for c in ALPHABET_LIST if not c in clause.arg])
+        elif kind == QUERY_LETTERSET:
+            return self.stats.letter_set_hist[clause.arg] / N if clause.arg <= 26 else 0.0
+        elif kind == QUERY_SUBSTRING:
+            sub = clause.arg
+            if len(sub) == 1:
+                return self.letter_fraction(sub)
+            if len(sub) == 2:
+                return self.stats.bigram_count(sub) / N
+            return min([self.stats.trigram_count(sub[i:i+3]) for i in range(len(sub) - 2)]) / N
+        elif kind == QUERY_PATTERN:
+            tokens = PatternIndex.parse(clause.arg)
+            fixed = [tok for tok in tokens if tok is not None and tok != PATTERN_STAR]
+            if PATTERN_STAR in tokens:
+                f = math.prod([sum([self.letter_fraction(c) for c in tok]) for tok in fixed])
+                return min(1.0, f)
+            n = len(tokens)
+            n_len = self.stats.length_hist[n] if n <= STATS_MAX_LEN else 0
+            if n_len == 0:
+                return 0.0
+            f = n_len / N
+            for pos, tok in enumerate(tokens):
+                if tok is not None and pos < STATS_MAX_LEN:
+                    f *= min(1.0, sum([self.stats.letter_position_counts(c, n)[pos] for c in tok]) / n_len)
+            return f
+        elif kind in (QUERY_IN, QUERY_NOT_IN):
+            other = len(get_corpus(clause.arg))
+            f = min(1.0, other / N)
+            return f if kind == QUERY_IN else 1 - f
+        raise ValueError(f'Unknown query clause: {clause}')
+
+    def method(self, clause: QueryClause) -> str:
+        if clause.kind in (QUERY_SUBSET, QUERY_LETTERSET):
+            return PLAN_SCAN
+        elif clause.kind == QUERY_SUBSTRING:
+            return PLAN_POSTINGS
+        elif clause.kind in (QUERY_IN, QUERY_NOT_IN):
+            return PLAN_JOIN
+        return PLAN_BITSET
+
+    def plan(self, query: WordQuery) -> list[QueryStep]:
+        """ Returns the steps in the order they will run: index steps first, then scan steps. """
+        if isinstance(query, str):
+            query = WordQuery.parse(query)
+        steps = sorted([QueryStep(c, self.method(c), self.estimate(c)) for c in query.clauses],
+                       key=lambda step: step.estimate)
+        index_steps = list()
+        scan_steps = list()
+        expected = self.n_words
+        for step in steps:
+            if step.method != PLAN_SCAN and step.estimate <= PLAN_INDEX_MAX_FRACTION and expected >= PLAN_SCAN_BELOW:
+                index_steps.append(step)
+                expected *= step.estimate
+            else:
+                step.method = PLAN_SCAN
+                scan_steps.append(step)
+        # Scan the cheap mask tests before the regexes and set probes.
+        scan_cost = {QUERY_LENGTH: 0, QUERY_CONTAINS: 0, QUERY_EXCLUDES: 0, QUERY_SUBSET: 0, QUERY_LETTERSET: 0,
+                     QUERY_SUBSTRING: 1, QUERY_IN: 1, QUERY_NOT_IN: 1, QUERY_PATTERN: 2}
+        scan_steps.sort(key=lambda step: (scan_cost[step.clause.kind], step.estimate))
+        return index_steps + scan_steps
+
+    def explain(self, query: WordQuery) -> str:
+        if isinstance(query, str):
+            query = WordQuery.parse(query)
+        lines = [f'Query: {query}  over {self.n_words} words']
+        expected = self.n_words
+        for i, step in enumerate(self.plan(query), 1):
+            expected *= step.estimate
+            lines.append(f'{i}. {step.method:8} {step.clause!r:30} passes ~{step.estimate:.2%}, ~{expected:.0f} words left')
+        return '\n'.join(lines)
+
+    def clause_bits(self, clause: QueryClause) -> int:
+        kind = clause.kind
+        if kind == QUERY_LENGTH:
+            return self.pattern_index().length_bits(*clause.arg)
+        elif kind == QUERY_CONTAINS:
+            bits = (1 << self.n_words) - 1
+            for c in clause.arg:
+                bits &= self.pattern_index().by_letter.get(c, 0)
+            return bits
+        elif kind == QUERY_EXCLUDES:
+            bits = (1 << self.n_words) - 1
+            for c in clause.arg:
+                bits &= ~self.pattern_index().by_letter.get(c, 0)
+            return bits
+        elif kind == QUERY_PATTERN:
+            return self.pattern_index().match_bits(clause.arg)
+        elif kind == QUERY_SUBSTRING:
+            return ids_to_bits(self.ngram_index().ids_containing(clause.arg))
+        elif kind in (QUERY_IN, QUERY_NOT_IN):
+            if self.word_ids is None:
+                self.word_ids = {w.word: i for i, w in enumerate(self.corpus.word_list)}
+            other = get_corpus(clause.arg)
+            bits = ids_to_bits([self.word_ids[s] for s in other.word_dict if s in self.word_ids])
+            return bits if kind == QUERY_IN else ((1 << self.n_words) - 1) & ~bits
+        raise ValueError(f'No index for query clause: {clause}')
+
+    @staticmethod
+    def clause_test(clause: QueryClause):
+        """ Returns a function testing a single Word against the clause. """
+        kind = clause.kind
+        arg = clause.arg
+        if kind == QUERY_LENGTH:
+            return lambda w: arg[0] <= len(w.word) <= arg[1]
+        elif kind == QUERY_CONTAINS:
+            mask = Word(arg).letter_set_mask
+            return lambda w: w.letter_set_mask & mask == mask
+        elif kind == QUERY_EXCLUDES:
+            mask = Word(arg).letter_set_mask
+            return lambda w: w.letter_set_mask & mask == 0
+        elif kind == QUERY_SUBSET:
+            outside = ALL_LETTERS_MASK & ~Word(arg).letter_set_mask
+            return lambda w: w.letter_set_mask & outside == 0
+        elif kind == QUERY_LETTERSET:
+            return lambda w: len(w.letter_set) == arg
+        elif kind == QUERY_PATTERN:
+            regex = re.compile(PatternIndex.regex(PatternIndex.parse(arg)))
+            return lambda w: regex.fullmatch(w.word) is not None
+        elif kind == QUERY_SUBSTRING:
+            return lambda w: arg in w.word
+        elif kind in (QUERY_IN, QUERY_NOT_IN):
+            word_dict = get_corpus(arg).word_dict
+            if kind == QUERY_IN:
+                return lambda w: w.word in word_dict
+            return lambda w: not w.word in word_dict
+        raise ValueError(f'Unknown query clause: {clause}')
+
+    def run(self, query) -> list[Word]:
+        """ Returns the Words (in corpus order) satisfying every clause of the query,
+            which may be a WordQuery or query text.
         """
-        wl = cls.from_file(path)
-        return cls.random_from_wordlist(wl, N)
+        if isinstance(query, str):
+            query = WordQuery.parse(query)
+        words = self.corpus.word_list
+        bits = None
+        tests = list()
+        for step in self.plan(query):
+            if step.method == PLAN_SCAN:
+                tests.append(self.clause_test(step.clause))
+            else:
+                clause_bits = self.clause_bits(step.clause)
+                bits = clause_bits if bits is None else bits & clause_bits
+        candidates = words if bits is None else [words[i] for i in bits_to_ids(bits)]
+        for test in tests:
+            candidates = [w for w in candidates if test(w)]
+        return candidates
+
+    def count(self, query) -> int:
+        return len(self.run(query))
+
+PLANNERS = dict() # corpus name -> QueryPlanner
+
+def query_planner(name_or_path: str = 'wordle-all') -> QueryPlanner:
+    """ Returns the planner for the sorted view of the corpus, rebuilt when the corpus changes. """
+    corpus = get_corpus(name_or_path, sort=True)
+    planner = PLANNERS.get(name_or_path)
+    if planner is None or planner.corpus is not corpus:
+        planner = QueryPlanner(corpus)
+        PLANNERS[name_or_path] = planner
+    return planner
+
+def query_words(query, name_or_path: str = 'wordle-all') -> list[Word]:
+    # E.g. query_words("length 5, contains {J,A,N}, not in answers")
+    return query_planner(name_or_path).run(query)
+
+ROARING_ARRAY = 'array'   # sorted array('H') of the low 16 bits
+ROARING_BITMAP = 'bitmap' # int with a bit set for each low 16 bits value
+ROARING_RUN = 'run'       # array('H') of (start, length - 1) pairs
+ROARING_ARRAY_MAX = 4096  # an array this long is as big as a bitmap (8KB)
+ROARING_BITMAP_BYTES = 8192
+
+def roaring_runs(bits: int) -> list[tuple]:
+    """ Returns the (start, length) runs of set bits in the int, in ascending order. """
+    runs = list()
+    while bits:
+        start = (bits & -bits).bit_length() - 1
+        shifted = bits >> start
+        length = (~shifted & (shifted + 1)).bit_length() - 1
+        runs.append((start, length))
+        bits &= ~(((1 << length) - 1) << start)
+    return runs
+
+def roaring_container(bits: int) -> tuple:
+    """ Returns the smallest (kind, data) container holding the 16-bit values set in bits, or None if empty. """
+    n = bits.bit_count()
+    if n == 0:
+        return None
+    n_runs = (bits & ~(bits << 1)).bit_count()
+    run_bytes = n_runs * 4
+    if run_bytes < min(n * 2, ROARING_BITMAP_BYTES):
+        data = array('H')
+        for start, length in roaring_runs(bits):
+            data.append(start)
+            data.append(length - 1)
+        return ROARING_RUN, data
+    if n <= ROARING_ARRAY_MAX:
+        return ROARING_ARRAY, array('H', bits_to_ids(bits))
+    return ROARING_BITMAP, bits
+
+def roaring_container_bits(container: tuple) -> int:
+    kind, data = container
+    if kind == ROARING_BITMAP:
+        return data
+    elif kind == ROARING_ARRAY:
+        return ids_to_bits(data)
+    bits = 0
+    for i in range(0, len(data), 2):
+        bits |= ((1 << (data[i+1] + 1)) - 1) << data[i]
+    return bits
 
-    @classmethod
-    def from_sub_alphabet_hgrams(cls, words: list, alphabet: set) -> object:
-        sub_wl = cls()
-        for w in words:
-            if w.is_heterogram() and w.letter_set.issubset(alphabet):
-                sub_wl.add_word(w)
-        return sub_wl
-    
 @dataclass
-class AnagramsDict:
-    """ A dictionary of lists of anagrams.
-        The key to each list is the sorted letter set for the anagrams.
+class RoaringBitmap:
+    """ A compressed set of non-negative ints (word ids), roaring style: ids are
+        split by their high 16 bits into containers of up to 65536 low values,
+        and each container is whichever is smallest of a sorted array (sparse),
+        a bitmap (dense) or a list of runs (clustered, e.g. a lexicon's ids when
+        they were assigned from that lexicon in order).
+        Set operations work container by container on matching keys; two arrays
+        are combined as sets, anything else as bitmap ints, and the result is
+        stored in its smallest form again.
     """
-    anagrams: dict = field(default_factory=dict)
+    containers: dict = field(default_factory=dict) # high 16 bits -> (kind, data)
 
     def __len__(self) -> int:
-        return len(self.anagrams)
+        n = 0
+        for kind, data in self.containers.values():
+            if kind == ROARING_BITMAP:
+                n += data.bit_count()
+            elif kind == ROARING_ARRAY:
+                n += len(data)
+            else:
+                n += sum(data[1::2]) + len(data) // 2
+        return n
 
-    def word_key(self, w: Word) -> str:
-        return w.sorted_letters()
-    
-    def add_wordlist(self, wl: WordList):
-        for word in wl.word_set:
-            key = self.word_key(word)
-            if not key in self.anagrams:
-                self.anagrams[key] = list()
-            self.anagrams[key].append(word.word)
+    def __contains__(self, x: int) -> bool:
+        container = self.containers.get(x >> 16)
+        if container is None:
+            return False
+        kind, data = container
+        low = x & 0xFFFF
+        if kind == ROARING_BITMAP:
+            return (data >> low) & 1 == 1
+        elif kind == ROARING_ARRAY:
+            i = bisect.bisect_left(data, low)
+            return i < len(data) and data[i] == low
+        starts = data[0::2]
+        i = bisect.bisect_right(starts, low) - 1
+        return i >= 0 and low <= starts[i] + data[2*i+1]
 
-    def anagrams_of_word(self, w: Word) -> list:
-        ''' Returns None if there are no anagrams of w in the dict.
-            Returns a list (not containing w) of anagram strings if w is found.
-        '''
-        key = self.word_key(w)
-        agram_list = self.anagrams.get(key)
-        agrams = None
-        if not agram_list is None:
-            agrams = agram_list.copy()
-            agrams.remove(w.word)
-        return agrams
-    
-    def anagrams_of_str(self, s: str) -> list:
-        return self.anagrams_of_word(Word(s))
-    
-    def prune_keys(self, delkeys: list[str]):
-        for k in delkeys:
-            del self.anagrams[k]
+    def __iter__(self):
+        for key in sorted(self.containers):
+            base = key << 16
+            kind, data = self.containers[key]
+            if kind == ROARING_ARRAY:
+                for low in data:
+                    yield base + low
+            elif kind == ROARING_BITMAP:
+                for low in bits_to_ids(data):
+                    yield base + low
+            else:
+                for i in range(0, len(data), 2):
+                    yield from range(base + data[i], base + data[i] + data[i+1] + 1)
 
-    def prune(self):
-        '''Delete keys with fewer than two anagrams - these are often uninteresting.'''
-        self.prune_keys([k for k in self.anagrams if len(self.anagrams[k]) < 2])
+    def to_ids(self) -> list[int]:
+        return list(self)
 
-    def sort(self):
-        '''Sort each list of anagrams.'''
-        for v in self.anagrams.values():
-            v.sort()
-            
-    def total_words(self) -> int:
-        '''Returns sum of length of all anagrams lists in the dictionary.'''
-        total = 0
-        for k,v in self.anagrams.items():
-            total += len(v)
-        return total
+    def kinds(self) -> dict:
+        """ Returns the count of containers of each kind. """
+        counts = dict()
+        for kind, _ in self.containers.values():
+            counts[kind] = counts.get(kind, 0) + 1
+        return counts
+
+    @staticmethod
+    def combine(a: tuple, b: tuple, op: str) -> tuple:
+        if a[0] == ROARING_ARRAY and b[0] == ROARING_ARRAY:
+            sa = set(a[1])
+            if op == '&':
+                lows = sa.intersection(b[1])
+            elif op == '|':
+                lows = sa.union(b[1])
+            else:
+                lows = sa.difference(b[1])
+            if len(lows) <= ROARING_ARRAY_MAX:
+                return (ROARING_ARRAY, array('H', sorted(lows))) if lows else None
+            return roaring_container(ids_to_bits(lows))
+        ai = roaring_container_bits(a)
+        bi = roaring_container_bits(b)
+        if op == '&':
+            return roaring_container(ai & bi)
+        elif op == '|':
+            return roaring_container(ai | bi)
+        return roaring_container(ai & ~bi)
+
+    def __and__(self, other: object) -> object:
+        result = RoaringBitmap()
+        small, big = (self, other) if len(self.containers) <= len(other.containers) else (other, self)
+        for key, container in small.containers.items():
+            other_container = big.containers.get(key)
+            if other_container is not None:
+                c = self.combine(container, other_container, '&')
+                if c is not None:
+                    result.containers[key] = c
+        return result
+
+    def __or__(self, other: object) -> object:
+        result = RoaringBitmap(dict(self.containers))
+        for key, container in other.containers.items():
+            mine = result.containers.get(key)
+            result.containers[key] = container if mine is None else self.combine(mine, container, '|')
+        return result
+
+    def __sub__(self, other: object) -> object:
+        result = RoaringBitmap()
+        for key, container in self.containers.items():
+            other_container = other.containers.get(key)
+            c = container if other_container is None else self.combine(container, other_container, '-')
+            if c is not None:
+                result.containers[key] = c
+        return result
+
+    @classmethod
+    def from_ids(cls, ids) -> object:
+        by_key = dict()
+        for i in ids:
+            by_key.setdefault(i >> 16, []).append(i & 0xFFFF)
+        bm = cls()
+        for key, lows in by_key.items():
+            bm.containers[key] = roaring_container(ids_to_bits(lows))
+        return bm
 
 @dataclass
-class PerfectAnagramsDict(AnagramsDict):
-    """ A dictionary of lists of anagrams.
-        The key to each list is the sorted letter LIST, joined back into a string, for the anagrams.
-        This yields what are called "perfect" anagrams, ie formed from exactly the same letters
-        respecting repeats, vs regular anagrams, which are formed from the same SET of letters
-        without regard to repeated letters.
+class WordIdSpace:
+    """ Gives every distinct word string one integer id for the life of the process,
+        so that any two lexicons can be compared as RoaringBitmaps of ids.
+        A lexicon's new words get their ids in sorted order, so a lexicon mostly
+        made of new words becomes a few long runs.
     """
-    def word_key(self, w: Word) -> str:
-        letters = sorted(list(w.word))
-        return ''.join(letters)
-    
-WORDNIK_WORDLIST_PATH = './wordnik-wordlist'
-WORDNIK_ADDITIONS_PATH = './wordnik-additions'
+    ids: dict = field(default_factory=dict, repr=False)   # word string -> id
+    words: list = field(default_factory=list, repr=False) # id -> word string
+    lexicons: dict = field(default_factory=dict, repr=False) # name -> (WordList, RoaringBitmap)
 
-WORDLE_ALL_PATH = 'wordle/ALL'
-WORDLE_ANSWERS_PATH = 'wordle/ANSWERS'
-WORDLE_GUESSES_PATH = 'wordle/NON-ANSWERS'
-WORDLE_PU_PATH = 'wordle/PU'
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def id_of(self, s: str) -> int:
+        word_id = self.ids.get(s)
+        if word_id is None:
+            word_id = len(self.words)
+            self.ids[s] = word_id
+            self.words.append(s)
+        return word_id
+
+    def bitmap_of(self, wl: WordList) -> RoaringBitmap:
+        for s in sorted([s for s in wl.word_dict if not s in self.ids]):
+            self.id_of(s)
+        return RoaringBitmap.from_ids([self.ids[s] for s in wl.word_dict])
+
+    def lexicon(self, name_or_path: str) -> RoaringBitmap:
+        """ Returns the bitmap of a corpus (see get_corpus), rebuilt if the corpus has changed. """
+        wl = get_corpus(name_or_path)
+        entry = self.lexicons.get(name_or_path)
+        if entry is None or entry[0] is not wl:
+            entry = (wl, self.bitmap_of(wl))
+            self.lexicons[name_or_path] = entry
+        return entry[1]
+
+    def words_of(self, bitmap: RoaringBitmap) -> list[str]:
+        return sorted([self.words[i] for i in bitmap])
+
+    def memberships(self, words: list, names: list[str]) -> list[tuple]:
+        """ Returns (word, tuple of the names of the lexicons containing it) for each Word or string. """
+        bitmaps = [(name, self.lexicon(name)) for name in names]
+        result = list()
+        for w in words:
+            s = w.word if isinstance(w, Word) else w.upper()
+            word_id = self.ids.get(s)
+            result.append((w, tuple([name for name, bm in bitmaps if word_id is not None and word_id in bm])))
+        return result
+
+WORD_IDS = WordIdSpace()
 
 WORDLE_UNSCORED = ''
 WORDLE_BLACK = '-'
@@ -782,7 +4227,7 @@ class WordTrains:
         return playable
     
     def read_word_list(self, path: str):
-        new_word_list = WordList.from_file(path)
+        new_word_list = get_corpus(path)
         self.word_list.add_wordlist(new_word_list)
         self.word_list.sort() # not really necessary but I like to keep it sorted...
 
@@ -831,23 +4276,18 @@ class WordTrains:
         return word_train
 
 def how_many_wordles_can_yield_5_yellows():
-    valid_guesses = WordList.from_file(WORDLE_GUESSES_PATH)
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    #print('nonanswer guesses len=', len(valid_guesses))
-    #print('answers len=', len(answers))
-    valid_guesses.add_wordlist(answers)
+    valid_guesses = get_corpus('wordle-all')
+    answers = get_corpus('wordle-answers')
     #print('valid guesses (includes answers) len=', len(valid_guesses))
     
     # The guess_anagrams dict INCLUDES answers
-    guess_anagrams = AnagramsDict()
-    guess_anagrams.add_wordlist(valid_guesses)
+    guess_anagrams = AnagramsDict.for_wordlist(valid_guesses)
     guess_anagrams.prune()
     #print('len GUESS anagrams(pruned)=', len(guess_anagrams))
     #print('total words in GUESS anagrams(pruned)=', guess_anagrams.total_words())
 
     # answer_anagrams is JUST answers.
-    answer_anagrams = AnagramsDict()
-    answer_anagrams.add_wordlist(answers)
+    answer_anagrams = AnagramsDict.for_wordlist(answers)
     # answer_anagrams.prune() - don't prune answer angrams: these might have anagrams in the total valid guesses set, that didn't appear in the answers-only set.
     #print('len ANSWER anagrams=', len(answer_anagrams))
     #print('total words in ANSWER anagrams=', answer_anagrams.total_words())
@@ -1037,8 +4477,7 @@ def print_wordle_result_patterns(start_word_str: str):
         return f"{r[0]}"
         #return f"{r[0]} {r[2]}"
     
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    answers.sort()
+    answers = get_corpus('wordle-answers', sort=True)
 
     print(start_word_str.upper())
     l = list()
@@ -1065,59 +4504,50 @@ def print_wordle_result_patterns(start_word_str: str):
             print(words_left)
 
 def all_wordleable_wordlist() -> WordList:
-    wordleable = WordList.from_file(WORDLE_GUESSES_PATH)
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    wordleable.add_wordlist(answers)
-    wordleable.sort()
-    return wordleable
+    # Shared and cached: don't modify the returned list.
+    return get_corpus('wordle-all', sort=True)
+
+def repeat_letters_category(pattern: str) -> str:
+    # Classifies the repeated letters of a 5-letter word from its letter pattern (e.g. ABCCA).
+    n_letters = len(set(pattern))
+    if n_letters == 5:
+        return "h-gram:" # count: 9365 (these are heterograms aka h-grams)
+    elif n_letters == 4: # There can only be one letter repeated one time: DL(a)
+        return "1 DL (case a):" # count: 4899 (but this is an undercount so far)
+    elif n_letters == 3: # There can be one or two repeated letters
+        # 578 words fall into this case.
+        # If there are two repeated letters, each is repeated once: DL(b) eg ANNAL
+        # If there's only one repeated letter, it's a triple (TL) eg NANNY
+        n_repeated_letters = len([c for c in set(pattern) if pattern.count(c) > 1])
+        if n_repeated_letters == 2:
+            return "2 DL (case b):" # 430 words
+        elif n_repeated_letters == 1:
+            return "TL (case a):" # 148 words
+    elif n_letters == 2:
+        # There are 14 words (as of this writing: 16 Sept 2023) in this case.
+        # These all comprise one triple and one double letter.
+        # AGGAG ALALA ANANA ANNAN AYAYA COCCO ESSES LOLLO MAMMA NANNA NONNO PEEPE SUSUS TAATA
+        return "TL (case b):"
+    return '!!!!!' # No words should fall into this case!
 
 def count_repeat_letters():
-    valid_guesses = WordList.from_file(WORDLE_GUESSES_PATH)
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    #print('nonanswer guesses len=', len(valid_guesses))
-    #print('answers len=', len(answers))
-    valid_guesses.add_wordlist(answers)
+    valid_guesses = get_corpus('wordle-all', sort=True)
     print('All valid guesses (includes answers) len=', len(valid_guesses))
-    valid_guesses.sort()
-    
+
+    # Each word's category depends only on its letter pattern, of which there are just a few dozen.
+    index = IsomorphIndex.from_wordlist(valid_guesses)
+    categories = {pattern: repeat_letters_category(pattern) for pattern in index.patterns}
     for w in valid_guesses.word_list:
-        # Count repeated letters in each word.
-        # If the word's letter set length is 5, there are no repeated letters = 0
-        if len(w.letter_set) == 5:
-            print("h-gram:", w) # count: 9365 (these are heterograms aka h-grams)
-        elif len(w.letter_set) == 4: # There can only be one letter repeated one time: DL(a)
-            print("1 DL (case a):", w) # count: 4899 (but this is an undercount so far)
-        elif len(w.letter_set) == 3: # There can be one or two repeated letters
-            # 578 words fall into this case.
-            # If there are two repeated letters, each is repeated once: DL(b) eg ANNAL
-            # If there's only one repeated letter, it's a triple (TL) eg NANNY
-
-            # Count how many letters in the set occur more than once in the word.
-            letters_list = list(w.word)
-            n_repeated_letters = 0
-            for c in w.letter_set:
-                if letters_list.count(c) > 1:
-                    n_repeated_letters += 1
-            if n_repeated_letters == 2:
-                print("2 DL (case b):", w) # 430 words
-            elif n_repeated_letters == 1:
-                print("TL (case a):", w) # 148 words
-            else:
-                print('!!!!!', w) # No words should fall into this case!
+        print(categories[letter_pattern(w.word)], w)
 
-        elif len(w.letter_set) == 2:
-            # There are 14 words (as of this writing: 16 Sept 2023) in this case.
-            # These all comprise one triple and one double letter.
-            # AGGAG ALALA ANANA ANNAN AYAYA COCCO ESSES LOLLO MAMMA NANNA NONNO PEEPE SUSUS TAATA
-            print("TL (case b):", w) 
-        else:
-            print('!!!!!', w) # No words should fall into this case!
-        
-    #pass
+def solve_cryptogram(ciphertext: str, max_solutions: int = 10):
+    solver = CryptogramSolver.from_wordlist(get_corpus('wordnik'), no_fixed_letters=True)
+    for plaintext, _ in solver.solve(ciphertext, max_solutions):
+        print(plaintext)
 
 def count_palindromes():
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    non_answers = WordList.from_file(WORDLE_GUESSES_PATH)
+    answers = get_corpus('wordle-answers')
+    non_answers = get_corpus('wordle-guesses')
     print('answers len=', len(answers))
     for w in answers.word_list:
         if w.is_palindrome():
@@ -1128,116 +4558,78 @@ def count_palindromes():
             print(w)
         
 def find_subsets(subset_list):
-    valid_guesses = WordList.from_file(WORDLE_GUESSES_PATH)
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    valid_guesses.add_wordlist(answers)
+    valid_guesses = get_corpus('wordle-all', sort=True)
     print('All valid guesses (includes answers) len=', len(valid_guesses))
-    valid_guesses.sort()
 
+    planner = query_planner('wordle-all')
     for subset_str in subset_list:
         print("####", subset_str)
-        test_set = set(subset_str.upper())
-        for w in valid_guesses.word_list:
-            # If the candidate letter set is a subset of the word's letter set then that's what we're looking for!
-            if test_set.issubset(w.letter_set):
-                print("1. `{}`".format(w))
+        # The candidate letter set must be a subset of the word's letter set.
+        for w in planner.run(WordQuery().where(QUERY_CONTAINS, WordQuery.letters_arg(subset_str))):
+            print("1. `{}`".format(w))
         
 def find_subsets_of(superset_list):
-    valid_guesses = WordList.from_file(WORDLE_GUESSES_PATH)
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    valid_guesses.add_wordlist(answers)
+    valid_guesses = get_corpus('wordle-all', sort=True)
     print('All valid guesses (includes answers) len=', len(valid_guesses))
-    valid_guesses.sort()
 
+    planner = query_planner('wordle-all')
     for superset_str in superset_list:
         print("####", superset_str)
-        test_set = set(superset_str.upper())
-        for w in valid_guesses.word_list:
-            # If the word's letter set is a subset of this superset, then that's what we're looking for!
-            if w.letter_set.issubset(test_set):
-                print("1. `{}`".format(w))
+        # The word's letter set must be a subset of this superset.
+        for w in planner.run(WordQuery().where(QUERY_SUBSET, WordQuery.letters_arg(superset_str))):
+            print("1. `{}`".format(w))
         
 def find_month_abbrev_words():
-    valid_guesses = WordList.from_file(WORDLE_GUESSES_PATH)
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    valid_guesses.add_wordlist(answers)
+    valid_guesses = get_corpus('wordle-all', sort=True)
     print('All valid guesses (includes answers) len=', len(valid_guesses))
-    valid_guesses.sort()
     
     mondict = {'JAN': "January", 'FEB': "February", 'MAR': "March", 'APR': "April", 'MAY': "May", 'JUN': "June", 'JUL':"July", 'AUG': "August", 'SEP': "September", 'OCT': "October", 'NOV': "November", 'DEC': "December"}
     
+    planner = query_planner('wordle-all')
     for mon, month in mondict.items():
         print("####", mon, month)
-        mon_set = set(mon)
-        month_set = set(month.upper())
-        for w in valid_guesses.word_list:
-            # If the month letter set is a subset of the word's letter set then that's what we're looking for!
-            if mon_set.issubset(w.letter_set):
-                # Check also and put a '*' on words that are also a proper subset of the full month name.
-                asterisk = '*' if w.letter_set.issubset(month_set) else ''
-                if asterisk != '':
-                    print("1.", w, asterisk)
+        # Words containing the month abbreviation's letters, using no letters outside the full month name.
+        for w in planner.run(f'contains {mon}, subset of {month}'):
+            print("1.", w, '*')
         
 def find_month_subset_words():
     find_subsets_of(["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"])
     
 def find_day_abbrev_words():
-    valid_guesses = WordList.from_file(WORDLE_GUESSES_PATH)
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    valid_guesses.add_wordlist(answers)
+    valid_guesses = get_corpus('wordle-all', sort=True)
     print('All valid guesses (includes answers) len=', len(valid_guesses))
-    valid_guesses.sort()
 
+    planner = query_planner('wordle-all')
     for day in ['MON','TUE','WED','THU','FRI','SAT','SUN']:
         print("####", day)
-        day_set = set(day)
-        for w in valid_guesses.word_list:
-            # If the day letter set is a subset of the word's letter set then that's what we're looking for!
-            if day_set.issubset(w.letter_set):
-                print("1.", w)
+        for w in planner.run(f'contains {day}'):
+            print("1.", w)
 
 def find_name_words():
-    valid_guesses = WordList.from_file(WORDLE_GUESSES_PATH)
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    valid_guesses.add_wordlist(answers)
+    valid_guesses = get_corpus('wordle-all', sort=True)
     print('All valid guesses (includes answers) len=', len(valid_guesses))
-    valid_guesses.sort()
 
+    planner = query_planner('wordle-all')
     for name in ['DEZ','DOC','LIZ']:
         print("####", name)
-        name_set = set(name)
-        for w in valid_guesses.word_list:
-            # If the name letter set is a subset of the word's letter set then that's what we're looking for!
-            if name_set.issubset(w.letter_set):
-                print("1.", w)
-
-def find_letter_homes(letter: str, answers: WordList):
-    stats = dict()
-    N = 0
-    slot_count = [0, 0, 0, 0, 0]
-    rl_count = 0
-    for w in answers.word_list:
-        # First filter: the word must contain the letter
-        if letter in w.letter_set:
-            N += 1
-            rl = 0
-            # Now each time the letter appears in the word, increment the count in that slot.
-            # Also count up how many times the letter appears (repeats) in the word (RL).
-            for i in range(5):
-                if w.word[i] == letter:
-                    slot_count[i] += 1
-                    rl += 1
-            if rl > 1:
-                rl_count += 1
+        for w in planner.run(f'contains {name}'):
+            print("1.", w)
+
+def find_letter_homes(letter: str, answers: WordList, stats: CorpusStats = None):
+    # The slot counts come from the letter x position x length counts of the stats,
+    # which can be passed in so that all 26 letters share a single pass over the answers.
+    if stats is None:
+        stats = CorpusStats.for_wordlist(answers)
+    N = stats.letter_words[letter_index(letter)]
+    slot_count = stats.letter_position_counts(letter, 5)
+    rl_count = stats.letter_repeat_words[letter_index(letter)]
+    if rl_count > 0:
+        for w in answers.word_list:
+            if w.word.count(letter) > 1:
                 print(w)
             
     pct_has_letter = round((N / len(answers)) * 100)
-    pct_slot = [0, 0, 0, 0, 0]
-    pct_slot[0] = round((slot_count[0] / N) * 100)
-    pct_slot[1] = round((slot_count[1] / N) * 100)
-    pct_slot[2] = round((slot_count[2] / N) * 100)
-    pct_slot[3] = round((slot_count[3] / N) * 100)
-    pct_slot[4] = round((slot_count[4] / N) * 100)
+    pct_slot = [round((count / N) * 100) for count in slot_count]
     print(f"`{letter}`|{N:4d}|{pct_has_letter:2d}", end='')
     for p in pct_slot:
         print(f"|{p:2d}", end='')
@@ -1248,15 +4640,15 @@ def find_letter_homes(letter: str, answers: WordList):
     print()
     
 def find_Z_homes():
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    answers.sort()
+    answers = get_corpus('wordle-answers', sort=True)
     print(len(answers))
+    stats = CorpusStats.for_wordlist(answers)
     #for letter in ALPHABET_LIST:
-    #    find_letter_homes(letter, answers)
-    find_letter_homes('F', answers)
+    #    find_letter_homes(letter, answers, stats)
+    find_letter_homes('F', answers, stats)
 
 def write_wordnik_words():
-    wordnik_all = WordList.from_file(WORDNIK_WORDLIST_PATH)
+    wordnik_all = get_corpus('wordnik')
     print("Wordnik N=", len(wordnik_all))
     for w in wordnik_all.word_list:
         print(w)
@@ -1341,27 +4733,28 @@ def test_word_trains():
     wt.test_play_letters("holdup")
     wt.test_play_letters("anoramic")
 
-def score_all_wordleable_words_by_digraphs():
+def score_all_wordleable_words_by_digraphs(k: int = None):
+    # Scores every wordleable word by the answer-list word counts of the digraphs it contains,
+    # and prints the best k (or all of them if k is None), highest score first.
+    awl = all_wordleable_wordlist()
+    wl = get_corpus('wordle-answers')
+    weights = CorpusStats.for_wordlist(wl).bigram_words
+
+    scorer = DigraphScorer.for_wordlist(awl)
+    for score, w in scorer.top_k(weights, len(awl) if k is None else k):
+        print(score, w)
+
+def compare_digraph_scores(k: int):
+    # Prints the top k wordleable words under answer-only and under all-guesses digraph weights.
     awl = all_wordleable_wordlist()
-    wl = WordList.from_file(WORDLE_ANSWERS_PATH)
-    di = wl.digraphs_by_word()
-
-    word_digraph_score = dict()
-    for w in awl.word_list:
-        prev_letter = ''
-        digraphs = set()
-        for letter in w.word:
-            if prev_letter != '':
-                digraph = prev_letter + letter
-                digraphs.add(digraph)
-            prev_letter = letter
-        score = 0
-        for digraph in digraphs:
-            score += di.get(digraph,0)
-        word_digraph_score[w.word] = score
-
-    for k,v in word_digraph_score.items():
-        print(v, k)
+    answers = get_corpus('wordle-answers')
+    scorer = DigraphScorer.for_wordlist(awl)
+    tables = {'answers': CorpusStats.for_wordlist(answers).bigram_words,
+              'all': CorpusStats.for_wordlist(awl).bigram_words}
+    for name, top in scorer.rescore_many(tables, k).items():
+        print("####", name)
+        for score, w in top:
+            print(score, w)
 
 def random200():
     awl = all_wordleable_wordlist()
@@ -1370,39 +4763,101 @@ def random200():
     for w in rwl.word_list:
         print(w)
 
+def find_five_disjoint_words(processes: int = None):
+    # The classic puzzle: five wordleable words using 25 distinct letters between them.
+    search = DisjointLetterSetSearch.from_wordlist(all_wordleable_wordlist(), 5)
+    print('Distinct heterogram letter sets:', len(search.mask_words), file=sys.stderr)
+    solutions = search.mask_solutions(5, min_coverage=25, processes=processes or os.cpu_count())
+    print('Solutions (letter sets):', len(solutions), file=sys.stderr)
+    for mask_solution in solutions:
+        unused = mask_letters(ALL_LETTERS_MASK & ~sum(mask_solution))
+        for words in search.word_solutions(mask_solution):
+            print(' '.join([w.word for w in words]), unused)
+
+def solve_boggle(rows: str):
+    # E.g. solve_boggle("SERS PATG LINE SERS")
+    solver = BoggleSolver.from_wordlist(get_corpus('wordnik'))
+    words = solver.solve(parse_grid(rows))
+    print('Words:', len(words), ' score:', solver.score(words))
+    for w in words:
+        print(w)
+
+def generate_boggle_grids(min_words: int, max_words: int, count: int, seed: int = None):
+    solver = BoggleSolver.from_wordlist(get_corpus('wordnik'))
+    for grid, n_words, score in solver.generate_grids(min_words, max_words, count, seed=seed):
+        rows = [''.join(grid[i:i+4]) for i in range(0, 16, 4)]
+        print(' '.join(rows), n_words, score)
+
+def print_scrabble_moves(rack: str, rows: list[str] = None, k: int = 20):
+    # E.g. print_scrabble_moves("RETAIN?") on an empty board
+    generator = ScrabbleMoveGenerator.from_wordlist(get_corpus('wordnik'))
+    board = ScrabbleBoard() if rows is None else ScrabbleBoard.from_rows(rows)
+    for m in generator.moves(board, rack)[:k]:
+        direction = 'across' if m.across else 'down'
+        print(f"{m.score:4d} {m.word} at {m.row},{m.col} {direction}")
+
+def print_hangman_stats(path: str = WORDNIK_WORDLIST_PATH, strategy: str = HANGMAN_EXPECTED, k: int = 10):
+    solver = HangmanSolver.from_wordlist(get_corpus(path))
+    results = solver.simulate_all(strategy=strategy)
+    for n in sorted(solver.words.keys()):
+        wrongs = [results[s][1] for s in solver.words[n]]
+        print(f"{n:2d} letters: {len(wrongs):7d} words, {sum(wrongs) / len(wrongs):.2f} wrong guesses on average, {max(wrongs)} at most")
+    print("Hardest words:")
+    for s, (n_guesses, wrong) in sorted(results.items(), key=lambda item: (-item[1][1], item[0]))[:k]:
+        print(s, wrong, 'wrong of', n_guesses)
+
 def find_reversibles():
     awl = all_wordleable_wordlist()
+    suffixes = SuffixIndex.from_wordlist(awl)
 
-    anagrams = PerfectAnagramsDict()
-    anagrams.add_wordlist(awl)
+    anagrams = PerfectAnagramsDict.for_wordlist(awl)
     anagrams.prune() # remove items with only one anagram
     
-    palindromes = list()
-    seen = set()
     print("REVERSIBLE:")
-    for w in awl.word_list:
-        rw = w.reversed()
-        if w == rw:
-            palindromes.append(w)
-        elif not w in seen and rw in awl.word_set:
-            anas = anagrams.anagrams_of_word(w)
-            print(f"1. `{w}`-`{rw}`", end='')
-            if not anas is None and len(anas) > 1:
-                anas.remove(rw.word)
-                print("  [ ", end='')
-                for a in anas:
-                    print(f"`{a}` ", end='')
-                print("]")
-            else:
-                print()
-            seen.add(rw)
+    for w, rw in suffixes.reversal_pairs():
+        anas = anagrams.anagrams_of_str(w)
+        print(f"1. `{w}`-`{rw}`", end='')
+        if not anas is None and len(anas) > 1:
+            anas.remove(rw)
+            print("  [ ", end='')
+            for a in anas:
+                print(f"`{a}` ", end='')
+            print("]")
+        else:
+            print()
             
     print("PALINDROMES:", file=sys.stderr)
-    for p in palindromes:
+    for p in suffixes.palindromes():
         print(f"1. `{p}`", file=sys.stderr)
 
+def find_suffix_words(filepath: str, suffixes: list[str]):
+    # Prints the words from the given file ending with each of the given suffixes, e.g. "IGHT".
+    index = SuffixIndex.from_wordlist(get_corpus(filepath))
+    print('Suffix words from:', filepath, ' N total=', len(index), file=sys.stderr)
+    for suffix in suffixes:
+        words = index.ending_with(suffix)
+        print("####", suffix.upper(), len(words))
+        for w in words:
+            print("1. `{}`".format(w))
+
+def print_query(query: str, name_or_path: str = 'wordle-all', lexicons: list[str] = None):
+    # E.g. print_query("length 5, contains {J,A,N}, subset of JANUARY, not in answers", lexicons=['wordnik'])
+    # Each word is followed by the names of the given lexicons it's in.
+    planner = query_planner(name_or_path)
+    print(planner.explain(WordQuery.parse(query)), file=sys.stderr)
+    for w, names in WORD_IDS.memberships(planner.run(query), lexicons or []):
+        print("1. `{}`".format(w), *names)
+
+def print_lexicon_overlaps(names: list[str] = ['wordle-answers', 'wordle-guesses', 'wordnik']):
+    # Sizes of the intersection and both differences for every pair of the named lexicons.
+    bitmaps = {name: WORD_IDS.lexicon(name) for name in names}
+    for name, bm in bitmaps.items():
+        print(name, len(bm), bm.kinds())
+    for a, b in itertools.combinations(names, 2):
+        print(f'{a} & {b}: {len(bitmaps[a] & bitmaps[b])}  {a} - {b}: {len(bitmaps[a] - bitmaps[b])}  {b} - {a}: {len(bitmaps[b] - bitmaps[a])}')
+
 def find_pu_anagrams():
-    pu = WordList.from_file(WORDLE_PU_PATH)
+    pu = get_corpus('wordle-pu')
     print("N=", len(pu))
     print("SEQUENTIAL PU ANAGRAMS:")
     prev_w = None
@@ -1413,8 +4868,7 @@ def find_pu_anagrams():
         prev_w = w
 
     print("ALL PU ANAGRAMS (regardless of order):")
-    pu_anagrams = PerfectAnagramsDict()
-    pu_anagrams.add_wordlist(pu)
+    pu_anagrams = PerfectAnagramsDict.for_wordlist(pu)
     pu_anagrams.prune()
     pu_anagrams.sort()
     seq = 1
@@ -1422,26 +4876,51 @@ def find_pu_anagrams():
         print(seq, v)
         seq += 1
 
-def random_100_from_file():
+def random_100_from_file(seed=None):
     # Print a random 100 lines from a file (presumably longer than 100 lines!)
-    lines = list()
-    with open('wordnik-beewords', 'r') as f:
-        for line in f:
-            lines.append(line)
-    print("N lines = ", len(lines))
-    random100 = random.sample(lines, 100)
+    # The lines stream through a reservoir, so the file is never held in memory.
+    # zip() stops on the exhausted file before drawing from the counter, so the
+    # counter's next value is the number of lines read.
+    line_count = itertools.count()
+    with open_text('wordnik-beewords') as f:
+        random100 = reservoir_sample((line for line, n in zip(f, line_count)), 100, seed)
+    print("N lines = ", next(line_count))
     print("N random lines = ", len(random100))
     random100.sort()
     for l in random100:
         print(l, end='')
 
+def print_by_frequency(name_or_path: str = 'wordle-answers', n: int = 50):
+    # Print a corpus' n most frequent words, once compile_frequencies has given it a frequency column.
+    wl = get_corpus(name_or_path)
+    for w in wl.by_frequency()[:n]:
+        print(f'{wl.frequency(w):12} {w}')
+
+def solve_bee(letters: str, center: str):
+    bee = BeeSolver.for_wordlist(get_corpus('wordnik-bee'))
+    puzzle = bee.solve(letters, center)
+    print(f'{puzzle.letters} center={puzzle.center} N={len(puzzle.words)} score={puzzle.score}')
+    print('Pangrams:', puzzle.pangrams)
+    for w in puzzle.words:
+        print(w)
+
+def print_bee_puzzles(min_words: int, max_words: int):
+    # Prints every possible Bee puzzle (pangram letters + center) from the wordnik
+    # bee list having a word count within the given bounds, highest scores first.
+    bee = BeeSolver.for_wordlist(get_corpus('wordnik-bee'))
+    scores = bee.all_puzzle_scores()
+    print('Pangram letter sets:', len(scores) // BEE_N_LETTERS, ' puzzles:', len(scores), file=sys.stderr)
+    scores.sort(key=lambda t: (-t[3], t[0], t[1]))
+    for letters, center, n_words, score in scores:
+        if min_words <= n_words <= max_words:
+            print(letters, center, n_words, score)
+
 def find_single_double_letter_words(filepath: str):
     # Prints words from the given file that have ONLY one (a single) letter
     # that is doubled and doesn't appear more than two times, i.e. appears twice
     # in succession and no more, e.g. CHEER but not REFER or EERIE.
-    wl = WordList.from_file(filepath)
+    wl = get_corpus(filepath, sort=True)
     print('Double letter words from:', filepath, ' N total=', len(wl), file=sys.stderr)
-    wl.sort()
 
     for w in wl.word_list:
         if len(w.letter_set) == (len(w) - 1): # there is one letter repeated
@@ -1452,73 +4931,61 @@ def find_single_double_letter_words(filepath: str):
                     print("1. `{}`".format(w))
                 prev_letter = l
                 
+def print_pattern_matches(filepath: str, patterns: list[str]):
+    # Prints the words from the given file matching each crossword-style pattern, e.g. "A?P?E" or "*GN*".
+    index = PatternIndex.from_wordlist(get_corpus(filepath))
+    print('Pattern matches from:', filepath, ' N total=', len(index), file=sys.stderr)
+    for pattern, matches in index.match_all(patterns).items():
+        print("####", pattern, len(matches))
+        for w in sorted(matches):
+            print("1. `{}`".format(w))
+
 def find_set_overlap_words(filepath: str, letters: str, min_overlap: int):
-    wl = WordList.from_file(filepath)
+    wl = get_corpus(filepath)
     print('Overlapping words from:', filepath, ' N total=', len(wl), file=sys.stderr)
-    wl.sort()
+    index = LetterOverlapIndex.from_wordlist(wl)
     letters_word = Word(letters)
     print('Target letters:', letters_word.letter_set, ' min overlap=', min_overlap, file=sys.stderr)
-    
-    for w in wl.word_list:
+
+    for w, n_common in index.overlapping(letters, min_overlap):
         common_letters = letters_word.letter_set & w.letter_set
-        if len(common_letters) >= min_overlap:
-            t_count = w.word.count('T')
-            print(w, len(common_letters), common_letters, t_count)
+        t_count = w.word.count('T')
+        print(w, n_common, common_letters, t_count)
                 
 def word_length_histogram(filepath: str):
     # Counts lengths of words from the given file, and prints results.
-    wl = WordList.from_file(filepath)
+    wl = get_corpus(filepath, sort=True)
     N = len(wl)
     print('Word lengths from:', filepath, ' N total=', N, file=sys.stderr)
-    wl.sort()
-    
-    count = [0] * 30 # Longer than longest letter set we expect to encounter, ever
-    max_len = 0
-    exemplar = [''] * 30
+    stats = CorpusStats.for_wordlist(wl)
 
     for w in wl.word_list:
-        this_len = len(w.word)
-        count[this_len] += 1
-        if this_len > max_len:
-            max_len = this_len
-        if exemplar[this_len] == '':
-            exemplar[this_len] = w.word
-        if this_len == 2:
+        if len(w.word) == 2:
             print(w.word)
             
     print('Len  Count  % of N Words of this length  Exemplar')
     check = 0
-    for i in range(1, max_len+1):
-        check += count[i]
-        percent = count[i] / N
-        print(i, count[i], f'{percent:.2%}', exemplar[i])
+    for i in range(1, stats.max_length()+1):
+        count = stats.length_hist[i]
+        check += count
+        percent = count / N
+        print(i, count, f'{percent:.2%}', stats.length_exemplar.get(i, ''))
     print("Check count:", check, N)
     
 def letter_set_length_histogram(filepath: str):
     # Counts letter set sizes for words from the given file, and prints results.
-    wl = WordList.from_file(filepath)
+    wl = get_corpus(filepath)
     N = len(wl)
     print('Letter sets from:', filepath, ' N total=', N, file=sys.stderr)
-    wl.sort()
-    
-    count = [0] * 20 # Longer than longest letter set we expect to encounter, ever
-    max_len = 0
-    exemplar = [''] * 20
-
-    for w in wl.word_list:
-        this_len = len(w.letter_set)
-        count[this_len] += 1
-        if this_len > max_len:
-            max_len = this_len
-        exemplar[this_len] = w.word
-        #if exemplar[this_len] == '':
+    stats = CorpusStats.for_wordlist(wl)
             
     print('Len  Count  % of N Words with letter set of this length  Exemplar')
     check = 0
-    for i in range(1, max_len+1):
-        check += count[i]
-        percent = count[i] / N
-        print(i, count[i], f'{percent:.2%}', exemplar[i])
+    for i in range(1, stats.max_letter_set_length()+1):
+        count = stats.letter_set_hist[i]
+        check += count
+        percent = count / N
+        print(i, count, f'{percent:.2%}', stats.letter_set_exemplar.get(i, ''))
     print("Check count:", check, N)
     
 def get_letter_set_lengths():
@@ -1531,40 +4998,29 @@ def print_letter_pair_counts(filepath: str):
     # The "by word" part means that if a word contains two of the same digraphs (like TUTUS) that only
     # adds 1 (one) to the count for the letter pair "TU" (i.e. TUTUS is just one more word containing "TU").
     # So, get all the by-word counts of each letter pair appearing in the word list found at the given path.
-    wl = WordList.from_file(filepath)
+    wl = get_corpus(filepath, sort=True)
     N = len(wl)
     print('Letter pairs from:', filepath, ' N total=', N, file=sys.stderr)
-    wl.sort()
-    #pair_counts = wl.digraphs_by_word() # key is the letter pair, value is the count
-    pair_lists = wl.digraph_lists_by_word()  # key is the letter pair, value is a list of words
+    stats = CorpusStats.for_wordlist(wl)
     
-    # We're going to rearrange the data from the pair counts { "GN": 28, ... }
-    # into a set of 26 lists of integers with 26 entries per list, so we end up
-    # with a "table" with 26 rows A-Z (first letter of the pair) and 26 columns
+    # The stats bigram table has 26 rows A-Z (first letter of the pair) and 26 columns
     # (second letter of the pair) containing the corresponding word count.
-    pairs_table = dict()
-    for c in ALPHABET_LIST:
-        counts_list = [0]*26
-        pairs_table[c] = counts_list
-
-    # Time to rearrange... and collect the pairs which have only single-digit counts
-    #for k,v in pair_counts.items():
-    single_digits = list()
-    for k,v in pair_lists.items():
-        row_letter = k[0]
-        col_letter = k[1]
-        # convert column letter to an index (assume they're already uppercase... they are)
-        col_index = ord(col_letter) - ord('A')
-        #pairs_table[row_letter][col_index] = v
-        count = len(v)
-        pairs_table[row_letter][col_index] = count
-        if count < 10:
-            single_digits.append(k)
-
+    pairs_table = stats.bigram_table()
     for c in ALPHABET_LIST:
         print(c, pairs_table[c])
 
-    single_digits.sort()
+    # Collect the pairs which have only single-digit counts, and just the words containing those.
+    single_digits = [pair for pair, count in stats.bigram_dict().items() if count < 10]
+    pair_lists = {pair: list() for pair in single_digits}
+    for w in wl.word_list:
+        seen = set()
+        for i in range(len(w.word) - 1):
+            pair = w.word[i:i+2]
+            l = pair_lists.get(pair)
+            if l is not None and not pair in seen:
+                l.append(w)
+                seen.add(pair)
+
     for pair in single_digits:
         l = pair_lists[pair]
         print(pair, len(l), end=' ')
@@ -1573,140 +5029,94 @@ def print_letter_pair_counts(filepath: str):
         print()
 
 def find_6L_minus_one_wordleables():
-    wordleable = WordList.from_file(WORDLE_ALL_PATH)
-    wordnik_all = WordList.from_file(WORDNIK_WORDLIST_PATH)
-    for w in wordnik_all.word_list:
-        if len(w.word) == 6:
-            for i in range(0,6):
-                left = w.word[0:i]
-                letter = w.word[i:i+1]
-                right = w.word[i+1:]
-                w5L = left + right
-                if wordleable.contains(w5L):
-                    print(f'{left}({letter.lower()}){right}')
+    wordleable = get_corpus(WORDLE_ALL_PATH)
+    wordnik_index = NeighborhoodIndex.for_file(WORDNIK_WORDLIST_PATH)
+    for w6L, i, w5L in wordnik_index.deletion_pairs(wordleable, 6):
+        left = w6L[0:i]
+        letter = w6L[i:i+1]
+        right = w6L[i+1:]
+        print(f'{left}({letter.lower()}){right}')
+
+def print_word_ladder(start: str, end: str):
+    graph = WordLadderGraph.for_file(WORDLE_ALL_PATH, len(start))
+    ladder = graph.shortest_ladder(start, end)
+    if ladder is None:
+        print("No ladder from", start.upper(), "to", end.upper())
+    else:
+        print(len(ladder) - 1, ' '.join(ladder))
+
+def print_word_ladder_stats():
+    # Connected components and diameter of the word ladder graph of all wordleable words.
+    graph = WordLadderGraph.for_file(WORDLE_ALL_PATH, 5)
+    components = graph.components()
+    print('Words:', len(graph), ' edges:', len(graph.neighbors) // 2, ' components:', len(components))
+    print('Largest components:', [len(c) for c in components[:10]])
+    print('Isolated words:', len([c for c in components if len(c) == 1]))
+    d, start, end = graph.diameter()
+    print('Diameter:', d, ' '.join(graph.shortest_ladder(start, end)))
 
 def find_wordleable_splits_2_8():
-    wordleable = WordList.from_file(WORDLE_ALL_PATH)
-    wordnik_all = WordList.from_file(WORDNIK_WORDLIST_PATH)
-    wordnik_2 = WordList()
-    wordnik_8 = WordList()
-    for w in wordnik_all.word_list:
-        l = len(w.word) 
-        if l == 2:
-            wordnik_2.add_word(w)
-        elif l == 8:
-            wordnik_8.add_word(w)
-    wordnik_2.sort()
-    wordnik_8.sort()
+    wordleable = get_corpus(WORDLE_ALL_PATH)
+    wordnik_all = get_corpus('wordnik')
 
     print('#### 2 8')
-    for w2 in wordnik_2.word_list:
-        for w8 in wordnik_8.word_list:
-            w10 = w2.word + w8.word
-            w5a = w10[0:5]
-            w5b = w10[5:]
-            if wordleable.contains(w5a) and wordleable.contains(w5b):
-                print(f'{w2.word} {w5a[2:5]}/{w5b}')
+    for (w2, w8), (w5a, w5b) in find_resplits((2, 8), (5, 5), wordnik_all, wordleable):
+        print(f'{w2.word} {w5a[2:5]}/{w5b}')
 
     print('#### 8 2')
-    for w8 in wordnik_8.word_list:
-        for w2 in wordnik_2.word_list:
-            w10 = w8.word + w2.word
-            w5a = w10[0:5]
-            w5b = w10[5:]
-            if wordleable.contains(w5a) and wordleable.contains(w5b):
-                print(f'{w5a}/{w5b[0:3]} {w2.word}')
+    for (w8, w2), (w5a, w5b) in find_resplits((8, 2), (5, 5), wordnik_all, wordleable):
+        print(f'{w5a}/{w5b[0:3]} {w2.word}')
 
                     
 def find_wordleable_splits_3_7():
-    wordleable = WordList.from_file(WORDLE_ALL_PATH)
-    wordnik_all = WordList.from_file(WORDNIK_WORDLIST_PATH)
-    wordnik_3 = WordList()
-    wordnik_7 = WordList()
-    for w in wordnik_all.word_list:
-        l = len(w.word) 
-        if l == 3:
-            wordnik_3.add_word(w)
-        elif l == 7:
-            wordnik_7.add_word(w)
-    wordnik_3.sort()
-    wordnik_7.sort()
+    wordleable = get_corpus(WORDLE_ALL_PATH)
+    wordnik_all = get_corpus('wordnik')
 
     print('#### 3 7')
-    for w3 in wordnik_3.word_list:
-        for w7 in wordnik_7.word_list:
-            w10 = w3.word + w7.word
-            w5a = w10[0:5]
-            w5b = w10[5:]
-            if wordleable.contains(w5a) and wordleable.contains(w5b):
-                print(f'{w3.word} {w5a[3:5]}/{w5b}')
+    for (w3, w7), (w5a, w5b) in find_resplits((3, 7), (5, 5), wordnik_all, wordleable):
+        print(f'{w3.word} {w5a[3:5]}/{w5b}')
 
     print('#### 7 3')
-    for w7 in wordnik_7.word_list:
-        for w3 in wordnik_3.word_list:
-            w10 = w7.word + w3.word
-            w5a = w10[0:5]
-            w5b = w10[5:]
-            if wordleable.contains(w5a) and wordleable.contains(w5b):
-                print(f'{w5a}/{w5b[0:2]} {w3.word}')
+    for (w7, w3), (w5a, w5b) in find_resplits((7, 3), (5, 5), wordnik_all, wordleable):
+        print(f'{w5a}/{w5b[0:2]} {w3.word}')
 
 def find_wordleable_splits_20_15_10():
-    wordleable = WordList.from_file(WORDLE_ALL_PATH)
-    wordnik_all = WordList.from_file(WORDNIK_WORDLIST_PATH)
-    wordnik_10 = WordList()
-    wordnik_15 = WordList()
-    wordnik_20 = WordList()
-    for w in wordnik_all.word_list:
-        l = len(w.word) 
-        if l == 10:
-            wordnik_10.add_word(w)
-        elif l == 15:
-            wordnik_15.add_word(w)
-        elif l == 20:
-            wordnik_15.add_word(w)
-    wordnik_10.sort()
-    wordnik_15.sort()
-    wordnik_20.sort()
+    wordleable = get_corpus(WORDLE_ALL_PATH)
+    wordnik_all = get_corpus('wordnik')
 
     """
     print('#### 10')
-    for w in wordnik_10.word_list:
-        w5a = w.word[0:5]
-        w5b = w.word[5:]
-        if wordleable.contains(w5a) and wordleable.contains(w5b):
-            print(w5a, w5b)
+    for _, pieces in find_resplits((10,), (5, 5), wordnik_all, wordleable):
+        print(*pieces)
     """
     """
     print('#### 15')
-    for w in wordnik_15.word_list:
-        w5a = w.word[0:5]
-        w5b = w.word[5:10]
-        w5c = w.word[10:]
-        if wordleable.contains(w5a) and wordleable.contains(w5b) and wordleable.contains(w5c):
-            print(w5a, w5b, w5c)
+    for _, pieces in find_resplits((15,), (5, 5, 5), wordnik_all, wordleable):
+        print(*pieces)
     """
     print('#### 20')
-    for w in wordnik_20.word_list:
-        w5a = w.word[0:5]
-        w5b = w.word[5:10]
-        w5c = w.word[10:15]
-        w5d = w.word[15:]
-        if wordleable.contains(w5a) and wordleable.contains(w5b) and wordleable.contains(w5c) and wordleable.contains(w5d):
-            print(w5a, w5b, w5c, w5d)
+    for _, pieces in find_resplits((20,), (5, 5, 5, 5), wordnik_all, wordleable):
+        print(*pieces)
+
+def print_wordleable_splits(word_lengths: tuple, piece_lengths: tuple):
+    # Prints wordnik word sequences of the given lengths whose letters re-split into wordleable words
+    # of the given piece lengths, e.g. (4, 6) into (5, 5), or (15,) into (5, 5, 5).
+    wordleable = get_corpus(WORDLE_ALL_PATH)
+    wordnik_all = get_corpus('wordnik')
+    print('####', *word_lengths)
+    for words, pieces in find_resplits(word_lengths, piece_lengths, wordnik_all, wordleable):
+        print(' '.join([w.word for w in words]), '/'.join(pieces))
 
 def find_wordle_anagrams(wordlen: int, with_answers_only: bool):
-    wordleable = WordList.from_file(WORDLE_ALL_PATH)
-    answers = WordList.from_file(WORDLE_ANSWERS_PATH)
-    
-    # First select words that have the given number of distinct letters
-    words = WordList()
-    for w in wordleable.word_list:
-        if wordlen == 0 or len(w.letter_set) == wordlen:
-            words.add_word(w)
+    wordleable = get_corpus(WORDLE_ALL_PATH)
+    answers = get_corpus('wordle-answers')
     
-    # Now add them to the perfect anagrams dict.
+    # Select words that have the given number of distinct letters, straight into the perfect anagrams dict.
+    words = wordleable.stream()
+    if wordlen != 0:
+        words = words.where_letterset_size(wordlen)
     ad = PerfectAnagramsDict()
-    ad.add_wordlist(words)
+    ad.add_words(words)
     ad.prune()
     ad.sort() # sorts each list of anagrams
     